@@ -13,6 +13,7 @@ import shutil
 import os
 
 from trademind.core.analyzer import StockAnalyzer
+from trademind.data.loader import load_cached_history
 
 
 class TestStockAnalyzer(unittest.TestCase):
@@ -136,7 +137,133 @@ class TestStockAnalyzer(unittest.TestCase):
         
         # 验证结果为空列表
         self.assertEqual(len(results), 0)
-    
+
+    @patch('yfinance.Ticker')
+    @patch('yfinance.download', return_value=pd.DataFrame())
+    def test_analyze_stocks_preserves_order(self, mock_download, mock_ticker):
+        """测试并发分析多只股票时结果保持输入顺序，且跳过无数据的股票"""
+        # 批量下载返回空结果，所有股票都回退到单只获取（不访问网络）
+        def make_ticker(symbol):
+            mock_ticker_instance = MagicMock()
+            if symbol == 'INVALID':
+                mock_ticker_instance.history.return_value = pd.DataFrame()
+            else:
+                mock_ticker_instance.history.return_value = self.mock_data
+            return mock_ticker_instance
+        mock_ticker.side_effect = make_ticker
+
+        symbols = ['MSFT', 'INVALID', 'AAPL', 'GOOG']
+
+        results = self.analyzer.analyze_stocks(symbols, max_workers=4)
+
+        # 验证结果顺序与输入顺序一致
+        self.assertEqual([r['symbol'] for r in results], ['MSFT', 'AAPL', 'GOOG'])
+
+    @patch('yfinance.Ticker')
+    @patch('yfinance.download', return_value=pd.DataFrame())
+    def test_analyze_stocks_refills_bounded_pending(self, mock_download, mock_ticker):
+        """测试未完成任务数受限时分批补充提交，所有股票都被分析且顺序不变"""
+        # 批量下载返回空结果，所有股票都回退到单只获取（不访问网络）
+        mock_ticker_instance = MagicMock()
+        mock_ticker_instance.history.return_value = self.mock_data
+        mock_ticker.return_value = mock_ticker_instance
+
+        symbols = ['MSFT', 'AAPL', 'GOOG', 'AMZN', 'NVDA']
+
+        # 单线程时最多同时挂起MAX_PENDING_PER_WORKER个任务，需要多轮补充提交
+        results = self.analyzer.analyze_stocks(symbols, max_workers=1)
+
+        self.assertEqual([r['symbol'] for r in results], symbols)
+
+    @patch('yfinance.Ticker')
+    @patch('yfinance.download')
+    def test_analyze_stocks_batch_download(self, mock_download, mock_ticker):
+        """测试多只股票时使用批量下载，缺失的股票回退到单只获取，两种途径的索引时区一致"""
+        # Ticker.history返回带交易所时区的索引；与yfinance一致，批量下载默认ignore_tz=True时返回无时区索引
+        tz_data = self.mock_data.tz_localize('America/New_York')
+        
+        def download(symbols, **kwargs):
+            frame = self.mock_data if kwargs.get('ignore_tz', True) else tz_data
+            return pd.concat({symbol: frame for symbol in ('AAPL', 'MSFT') if symbol in symbols}, axis=1)
+        mock_download.side_effect = download
+        mock_ticker_instance = MagicMock()
+        mock_ticker_instance.history.return_value = tz_data
+        mock_ticker.return_value = mock_ticker_instance
+
+        results = self.analyzer.analyze_stocks(['AAPL', 'MSFT', 'GOOG'])
+
+        self.assertEqual([r['symbol'] for r in results], ['AAPL', 'MSFT', 'GOOG'])
+        self.assertEqual(mock_download.call_count, 1)
+        # 只有批量结果中缺失的GOOG单独请求
+        self.assertEqual({c.args[0] for c in mock_ticker.call_args_list}, {'GOOG'})
+        
+        # 批量预取的数据与单只获取的数据索引时区相同
+        self.assertEqual(self.analyzer.prefetch_stock_data(['AAPL', 'MSFT', 'GOOG']), 2)
+        prefetched = self.analyzer.get_stock_data('AAPL')
+        fetched = self.analyzer.get_stock_data('GOOG')
+        self.assertEqual(str(prefetched.index.tz), str(fetched.index.tz))
+
+    @patch('yfinance.Ticker')
+    def test_analyze_stocks_fetches_history_once(self, mock_ticker):
+        """测试单只股票分析时压力位和趋势分析复用已获取的历史数据"""
+        mock_ticker_instance = MagicMock()
+        mock_ticker_instance.history.return_value = self.mock_data
+        mock_ticker.return_value = mock_ticker_instance
+
+        results = self.analyzer.analyze_stocks(['AAPL'])
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(mock_ticker_instance.history.call_count, 1)
+
+    @patch('yfinance.Ticker')
+    def test_get_stock_data_throttles_max_period_retry(self, mock_ticker):
+        """测试数据不足时获取最大可用数据的重试同样经过请求限速"""
+        mock_ticker_instance = MagicMock()
+        mock_ticker_instance.history.side_effect = [self.mock_data.tail(50), self.mock_data]
+        mock_ticker.return_value = mock_ticker_instance
+
+        with patch.object(self.analyzer, '_wait_for_request_slot') as mock_wait:
+            hist = self.analyzer.get_stock_data('AAPL')
+
+        self.assertEqual(len(hist), len(self.mock_data))
+        self.assertEqual(mock_ticker_instance.history.call_count, 2)
+        self.assertEqual(mock_wait.call_count, 2)
+
+    @patch('yfinance.Ticker')
+    def test_get_stock_data_uses_cache(self, mock_ticker):
+        """测试启用缓存后同一天内重复获取数据不再请求数据源"""
+        mock_ticker_instance = MagicMock()
+        mock_ticker_instance.history.return_value = self.mock_data
+        mock_ticker.return_value = mock_ticker_instance
+
+        analyzer = StockAnalyzer(cache_dir=os.path.join(self.temp_dir, 'cache'))
+
+        first = analyzer.get_stock_data('AAPL')
+        second = analyzer.get_stock_data('AAPL')
+
+        # 第二次从缓存读取，数据一致且只请求了一次
+        pd.testing.assert_frame_equal(first, second)
+        self.assertEqual(mock_ticker.call_count, 1)
+
+    @patch('yfinance.Ticker')
+    def test_analyze_stocks_reads_cache_once(self, mock_ticker):
+        """测试预取阶段读出的当日缓存直接用于分析，每只股票的缓存文件只读取一次"""
+        mock_ticker_instance = MagicMock()
+        mock_ticker_instance.history.return_value = self.mock_data
+        mock_ticker.return_value = mock_ticker_instance
+
+        analyzer = StockAnalyzer(cache_dir=os.path.join(self.temp_dir, 'cache'))
+        analyzer.get_stock_data('AAPL')
+        analyzer.get_stock_data('MSFT')
+
+        with patch('trademind.core.analyzer.load_cached_history', wraps=load_cached_history) as mock_load:
+            results = analyzer.analyze_stocks(['AAPL', 'MSFT'])
+
+        self.assertEqual([r['symbol'] for r in results], ['AAPL', 'MSFT'])
+        self.assertEqual(sorted(c.args[1] for c in mock_load.call_args_list), ['AAPL', 'MSFT'])
+        # 缓存命中，不再请求数据源
+        self.assertEqual(mock_ticker.call_count, 2)
+
     @patch('yfinance.Ticker')
     @patch('trademind.core.analyzer.generate_signals')
     @patch('trademind.core.analyzer.run_backtest')
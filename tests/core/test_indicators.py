@@ -13,7 +13,8 @@ from trademind.core.indicators import (
     calculate_macd,
     calculate_kdj,
     calculate_rsi,
-    calculate_bollinger_bands
+    calculate_bollinger_bands,
+    calculate_moving_averages
 )
 
 
@@ -122,5 +123,25 @@ class TestIndicators(unittest.TestCase):
         self.assertFalse(math.isnan(percent_b))
 
 
+    def test_calculate_moving_averages(self):
+        """测试多周期移动平均线与逐周期滚动均值一致"""
+        prices = self.prices.astype(float)
+        prices.iloc[12] = np.nan
+        averages = calculate_moving_averages(prices, (5, 10, 50))
+        
+        for window in (5, 10, 50):
+            expected = prices.rolling(window=window).mean()
+            pd.testing.assert_series_equal(averages[window], expected, check_exact=False, rtol=1e-12)
+        
+        # 窗口内含缺失值时为NaN，缺失值移出窗口后恢复
+        self.assertTrue(averages[5].iloc[12:17].isna().all())
+        self.assertFalse(math.isnan(averages[5].iloc[17]))
+        
+        # 非有限价格只影响包含它的窗口，之后的窗口与rolling一样恢复正常
+        prices = pd.Series([1, 2, np.inf, 4, 5, 6, 7, 8, 9, 10], dtype=float)
+        averages = calculate_moving_averages(prices, (3,))
+        pd.testing.assert_series_equal(averages[3], prices.rolling(window=3).mean())
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
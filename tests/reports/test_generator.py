@@ -10,6 +10,7 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from pathlib import Path
+from unittest.mock import patch
 from trademind.reports.generator import (
     generate_html_report,
     generate_performance_charts
@@ -211,6 +212,44 @@ class TestReportGenerator(unittest.TestCase):
         self.assertIn('profit_distribution', chart_paths)
         self.assertTrue(os.path.exists(chart_paths['profit_distribution']))
     
+    def test_generate_performance_charts_reuses_unchanged_charts(self):
+        """测试相同输入重复生成图表时复用已生成的文件，不再重新绘制"""
+        # yfinance返回的日期索引带时区；每次调用都新建内容相同的索引，验证摘要只取决于内容
+        date_factories = {
+            'naive': lambda: self.date_index.copy(),
+            'tz-aware': lambda: self.date_index.tz_localize('America/New_York')
+        }
+        for label, make_dates in date_factories.items():
+            with self.subTest(dates=label):
+                first = generate_performance_charts(
+                    trades=self.test_trades,
+                    equity=self.test_equity,
+                    dates=make_dates(),
+                    output_dir=self.temp_dir
+                )
+                
+                with patch('trademind.reports.generator.plt.savefig') as mock_savefig:
+                    second = generate_performance_charts(
+                        trades=self.test_trades,
+                        equity=self.test_equity,
+                        dates=make_dates(),
+                        output_dir=self.temp_dir
+                    )
+                
+                self.assertEqual(first, second)
+                mock_savefig.assert_not_called()
+                
+                # 图表文件被删除后重新绘制
+                os.remove(first['equity_curve'])
+                with patch('trademind.reports.generator.plt.savefig') as mock_savefig:
+                    generate_performance_charts(
+                        trades=self.test_trades,
+                        equity=self.test_equity,
+                        dates=make_dates(),
+                        output_dir=self.temp_dir
+                    )
+                self.assertTrue(mock_savefig.called)
+    
     def test_generate_html_report_with_empty_results(self):
         """测试生成空结果的HTML报告"""
         # 生成报告
@@ -4,16 +4,33 @@ TradeMind Lite（轻量版）- 回测系统模块
 本模块包含交易策略回测相关的函数，用于评估交易策略的性能。
 """
 
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple
+import math
 import pandas as pd
 import numpy as np
-from datetime import datetime
-import random
 import logging
 
 # 设置日志
 logger = logging.getLogger(__name__)
 
+# 一天对应的纳秒数，用于由int64时间戳计算持仓天数
+NS_PER_DAY = 86_400_000_000_000
+
+# Sharpe/Sortino比率的年化系数（按252个交易日），模块加载时算一次
+ANNUALIZATION_FACTOR = math.sqrt(252)
+
+# 平仓原因编码（交易记录中以uint8存储，输出时再查表转换为显示文字）
+EXIT_STOP = 0
+EXIT_TP = 1
+EXIT_MAXHOLD = 2
+EXIT_REVERSE = 3
+EXIT_REASON_LABELS = ("止损", "止盈", "最大持有期限", "反向信号")
+
+# 持仓方向编码
+POS_LONG = 1
+POS_SHORT = -1
+POSITION_LABELS = {POS_LONG: 'long', POS_SHORT: 'short'}
+
 def run_backtest(data: pd.DataFrame, signals: pd.DataFrame, 
                  initial_capital: float = 10000.0,
                  risk_per_trade_pct: float = 0.02,
@@ -53,7 +70,7 @@ def run_backtest(data: pd.DataFrame, signals: pd.DataFrame,
         
         # 执行交易模拟
         try:
-            trades, equity = simulate_trades(
+            trade_columns, equity = _simulate_trade_columns(
                 data, signals, 
                 initial_capital=initial_capital,
                 risk_per_trade_pct=risk_per_trade_pct,
@@ -62,8 +79,11 @@ def run_backtest(data: pd.DataFrame, signals: pd.DataFrame,
                 max_hold_days=max_hold_days
             )
             
-            # 计算性能指标
-            results = calculate_performance_metrics(trades, equity, initial_capital, data.index)
+            # 计算性能指标（直接使用列式交易记录，不构造逐笔字典）
+            results = _calculate_metrics_from_arrays(
+                trade_columns['profit'], trade_columns['hold_days'],
+                equity, initial_capital, data.index
+            )
             return results
             
         except Exception as e:
@@ -117,10 +137,36 @@ def simulate_trades(data: pd.DataFrame, signals: pd.DataFrame,
     返回:
         Tuple[List[Dict], List[float]]: 交易记录和权益曲线
     """
+    trade_columns, equity = _simulate_trade_columns(
+        data, signals,
+        initial_capital=initial_capital,
+        risk_per_trade_pct=risk_per_trade_pct,
+        stop_loss_pct=stop_loss_pct,
+        take_profit_pct=take_profit_pct,
+        max_hold_days=max_hold_days
+    )
+    return _trade_records(trade_columns, data.index), equity
+
+
+def _simulate_trade_columns(data: pd.DataFrame, signals: pd.DataFrame,
+                            initial_capital: float,
+                            risk_per_trade_pct: float,
+                            stop_loss_pct: float,
+                            take_profit_pct: float,
+                            max_hold_days: int) -> Tuple[Dict[str, np.ndarray], List[float]]:
+    """
+    交易模拟内核，交易记录按列写入预分配的定长数组
+    
+    参数:
+        与simulate_trades相同
+        
+    返回:
+        Tuple[Dict[str, np.ndarray], List[float]]: 列式交易记录（各列长度均为交易笔数）和权益曲线
+    """
     # 准备数据
-    close = data['Close'].copy()
-    high = data['High'].copy()
-    low = data['Low'].copy()
+    close = data['Close']
+    high = data['High']
+    low = data['Low']
     dates = data.index
     
     # 交易成本模型 (基于IBKR的固定费率模型)
@@ -135,24 +181,35 @@ def simulate_trades(data: pd.DataFrame, signals: pd.DataFrame,
     # 初始化回测变量
     position = 0  # 0表示空仓，1表示多头，-1表示空头
     entry_price = 0.0  # 入场价格
-    entry_date = None  # 入场日期
+    entry_index = 0  # 入场K线位置
+    entry_ns = 0  # 入场日期（纳秒时间戳）
+    stop_price = 0.0  # 止损价（开仓时按方向计算）
+    take_profit_price = 0.0  # 止盈价（开仓时按方向计算）
     capital = initial_capital  # 当前资金
     equity = [initial_capital]  # 权益曲线
-    trades = []  # 交易记录
-    
-    # 计算ATR (真实波动幅度)
-    tr1 = high - low
-    tr2 = abs(high - close.shift())
-    tr3 = abs(low - close.shift())
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-    atr = tr.rolling(window=14).mean()
     
-    # 使用Wilder的平滑方法
-    for i in range(14, len(tr)):
-        atr.iloc[i] = (atr.iloc[i-1] * 13 + tr.iloc[i]) / 14
-    
-    # 计算平均成交量
-    volume = data.get('Volume', pd.Series(np.ones(len(close)), index=close.index))
+    # 交易记录按列存储：每根K线最多平仓一次，交易笔数不超过可交易K线数
+    max_trades = max(len(signals) - 50, 0)
+    entry_idx = np.empty(max_trades, dtype=np.int64)
+    exit_idx = np.empty(max_trades, dtype=np.int64)
+    entry_price_arr = np.empty(max_trades, dtype=np.float64)
+    exit_price_arr = np.empty(max_trades, dtype=np.float64)
+    position_arr = np.empty(max_trades, dtype=np.int8)
+    shares_arr = np.empty(max_trades, dtype=np.float64)
+    profit_arr = np.empty(max_trades, dtype=np.float64)
+    hold_days_arr = np.empty(max_trades, dtype=np.int64)
+    exit_reason_arr = np.empty(max_trades, dtype=np.uint8)
+    n_trades = 0
+    
+    # 计算平均成交量（是否有成交量列只判断一次，有该列时不再构造备用的全1序列）
+    has_volume = 'Volume' in data.columns
+    volume = data['Volume'] if has_volume else pd.Series(np.ones(len(close)), index=close.index)
+    
+    # 预先计算前20日平均成交量（不含当日，跳过缺失值），替代循环内逐日切片求均值
+    if has_volume:
+        avg_volume_values = volume.rolling(window=20, min_periods=1).mean().shift(1).to_numpy(dtype=np.float64)
+    else:
+        avg_volume_values = np.full(len(close), 1000.0)
     
     # 确保信号数据包含必要的列
     if 'buy_signal' not in signals.columns:
@@ -161,114 +218,134 @@ def simulate_trades(data: pd.DataFrame, signals: pd.DataFrame,
         signals['sell_signal'] = False
     
     # 增强信号 - 添加额外的技术指标信号
-    enhanced_buy_signals = signals['buy_signal'].copy()
-    enhanced_sell_signals = signals['sell_signal'].copy()
+    # 各条件以NumPy布尔数组收集后统一按"任一满足"合并，避免逐次构造pandas Series
+    close_values = close.to_numpy(dtype=np.float64)
+    buy_conditions = [signals['buy_signal'].fillna(0).to_numpy().astype(bool)]
+    sell_conditions = [signals['sell_signal'].fillna(0).to_numpy().astype(bool)]
     
     # 如果有RSI数据，添加RSI超买超卖信号
     if 'rsi' in signals.columns:
-        rsi = signals['rsi']
+        rsi = signals['rsi'].to_numpy(dtype=np.float64)
         # RSI < 30 为买入信号
-        enhanced_buy_signals = enhanced_buy_signals | (rsi < 30)
+        buy_conditions.append(rsi < 30)
         # RSI > 70 为卖出信号
-        enhanced_sell_signals = enhanced_sell_signals | (rsi > 70)
+        sell_conditions.append(rsi > 70)
     
     # 如果有MACD数据，添加MACD金叉死叉信号
     if all(col in signals.columns for col in ['macd_line', 'signal_line']):
-        macd_line = signals['macd_line']
-        signal_line = signals['signal_line']
-        # MACD金叉为买入信号
-        macd_cross_up = (macd_line > signal_line) & (macd_line.shift() < signal_line.shift())
-        enhanced_buy_signals = enhanced_buy_signals | macd_cross_up
+        macd_line = signals['macd_line'].to_numpy(dtype=np.float64)
+        signal_line = signals['signal_line'].to_numpy(dtype=np.float64)
+        # MACD金叉为买入信号（第一根K线没有前值，恒为False）
+        macd_cross_up = np.zeros(len(macd_line), dtype=bool)
+        macd_cross_up[1:] = (macd_line[1:] > signal_line[1:]) & (macd_line[:-1] < signal_line[:-1])
+        buy_conditions.append(macd_cross_up)
         # MACD死叉为卖出信号
-        macd_cross_down = (macd_line < signal_line) & (macd_line.shift() > signal_line.shift())
-        enhanced_sell_signals = enhanced_sell_signals | macd_cross_down
+        macd_cross_down = np.zeros(len(macd_line), dtype=bool)
+        macd_cross_down[1:] = (macd_line[1:] < signal_line[1:]) & (macd_line[:-1] > signal_line[:-1])
+        sell_conditions.append(macd_cross_down)
     
     # 如果有布林带数据，添加布林带突破信号
     if all(col in signals.columns for col in ['upper_band', 'lower_band']):
-        upper_band = signals['upper_band']
-        lower_band = signals['lower_band']
+        upper_band = signals['upper_band'].to_numpy(dtype=np.float64)
+        lower_band = signals['lower_band'].to_numpy(dtype=np.float64)
         # 价格突破下轨为买入信号
-        bb_lower_break = (close < lower_band)
-        enhanced_buy_signals = enhanced_buy_signals | bb_lower_break
+        buy_conditions.append(close_values < lower_band)
         # 价格突破上轨为卖出信号
-        bb_upper_break = (close > upper_band)
-        enhanced_sell_signals = enhanced_sell_signals | bb_upper_break
-    
-    # 遍历每个交易日
-    for i in range(50, len(signals)):
-        current_date = dates[i]
-        current_price = close.iloc[i]
-        current_high = high.iloc[i]
-        current_low = low.iloc[i]
-        current_volume = volume.iloc[i]
-        avg_volume = volume.iloc[i-20:i].mean() if 'Volume' in data.columns else 1000  # 20日平均成交量
+        sell_conditions.append(close_values > upper_band)
+    
+    enhanced_buy_signals = np.logical_or.reduce(buy_conditions)
+    enhanced_sell_signals = np.logical_or.reduce(sell_conditions)
+    
+    # 循环前一次性转换为NumPy数组，避免循环内逐个.iloc取值
+    # 日期转为int64纳秒时间戳，持仓天数用整数除法计算，与Timedelta.days的向下取整一致
+    date_ns = np.asarray(dates.asi8)
+    high_values = high.to_numpy(dtype=np.float64)
+    low_values = low.to_numpy(dtype=np.float64)
+    volume_values = volume.to_numpy(dtype=np.float64)
+    
+    # 平仓滑点只取决于当日成交量与前20日均量之比，与持仓状态无关，循环前整列算好
+    # （均量缺失或非正时量比按1计）
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volume_ratio = np.where(avg_volume_values > 0, volume_values / avg_volume_values, 1.0)
+    slippage_values = base_slippage_pct + (market_impact_factor * volume_ratio / 100)
+    
+    # 滑点直接折算为成交价系数：平仓时多头卖出价格下调、空头买入价格上调；
+    # 开仓滑点和止损/止盈比例在整个回测中不变，系数只算一次
+    long_exit_factors = 1 - slippage_values
+    short_exit_factors = 1 + slippage_values
+    long_entry_factor = 1 + base_slippage_pct
+    short_entry_factor = 1 - base_slippage_pct
+    long_stop_factor, long_take_profit_factor = 1 - stop_loss_pct, 1 + take_profit_pct
+    short_stop_factor, short_take_profit_factor = 1 + stop_loss_pct, 1 - take_profit_pct
+    
+    # 逐K线循环中的价格×股数等标量运算只使用Python原生float/int/bool：
+    # NumPy标量参与算术时每次都要装箱和类型分派，比原生float慢数倍
+    close_list = close_values.tolist()
+    high_list = high_values.tolist()
+    low_list = low_values.tolist()
+    long_exit_factor_list = long_exit_factors.tolist()
+    short_exit_factor_list = short_exit_factors.tolist()
+    date_ns_list = date_ns.tolist()
+    buy_signal_list = enhanced_buy_signals.tolist()
+    sell_signal_list = enhanced_sell_signals.tolist()
+    
+    # 持仓期间与方向有关的取值列（止损/止盈检查价格、反向信号、平仓成交价系数），
+    # 开仓时按方向选定一次，逐K线检查时不再按position分支
+    adverse_list, favorable_list = low_list, high_list
+    reverse_signal_list, exit_factor_list = sell_signal_list, long_exit_factor_list
+    
+    # 空仓期间只有出现信号的K线才会改变状态，预先计算每个位置之后（含当前）第一根有信号的K线，
+    # 空仓时直接跳转过去，无信号的K线不再逐根进入循环
+    n_bars = len(signals)
+    signal_positions = np.where(enhanced_buy_signals | enhanced_sell_signals, np.arange(n_bars), n_bars)
+    next_signal_list = np.minimum.accumulate(signal_positions[::-1])[::-1].tolist()
+    
+    # 资金只在平仓时变化，权益曲线按区间整段填充：equity_filled之前的K线已写入权益曲线
+    equity_filled = 50
+    
+    # 遍历交易日（空仓时跳过无信号的K线）
+    i = 50
+    while i < n_bars:
+        if position == 0:
+            i = next_signal_list[i]
+            if i >= n_bars:
+                break
         
-        # 计算当前ATR
-        current_atr = atr.iloc[i]
+        current_price = close_list[i]
         
         # 如果有持仓，检查止损止盈
         if position != 0:
-            days_held = (current_date - entry_date).days
-            
-            # 计算浮动盈亏
-            if position == 1:  # 多头
-                profit_pct = (current_price - entry_price) / entry_price
-            else:  # 空头
-                profit_pct = (entry_price - current_price) / entry_price
+            days_held = (date_ns_list[i] - entry_ns) // NS_PER_DAY
             
-            # 检查止损条件
-            stop_triggered = False
-            if position == 1 and current_low <= entry_price * (1 - stop_loss_pct):
-                # 多头止损 - 使用当日最低价检查
-                stop_price = entry_price * (1 - stop_loss_pct)
-                stop_triggered = True
-            elif position == -1 and current_high >= entry_price * (1 + stop_loss_pct):
-                # 空头止损 - 使用当日最高价检查
-                stop_price = entry_price * (1 + stop_loss_pct)
-                stop_triggered = True
-            
-            # 检查止盈条件
-            take_profit_triggered = False
-            if position == 1 and current_high >= entry_price * (1 + take_profit_pct):
-                # 多头止盈 - 使用当日最高价检查
-                take_profit_price = entry_price * (1 + take_profit_pct)
-                take_profit_triggered = True
-            elif position == -1 and current_low <= entry_price * (1 - take_profit_pct):
-                # 空头止盈 - 使用当日最低价检查
-                take_profit_price = entry_price * (1 - take_profit_pct)
-                take_profit_triggered = True
+            # 检查止损止盈条件：止损价/止盈价以及检查用的价格列在开仓时已按方向选好，
+            # 多头用最低价检查止损、最高价检查止盈，空头相反；乘以position后两侧共用同一比较
+            stop_triggered = position * (adverse_list[i] - stop_price) <= 0
+            take_profit_triggered = position * (favorable_list[i] - take_profit_price) >= 0
             
             # 检查最大持有天数
             max_hold_triggered = days_held >= max_hold_days
             
-            # 检查反向信号
-            reverse_signal = (position == 1 and enhanced_sell_signals.iloc[i]) or (position == -1 and enhanced_buy_signals.iloc[i])
+            # 检查反向信号（开仓时已选好对应方向的信号列）
+            reverse_signal = reverse_signal_list[i]
             
             # 如果触发任何平仓条件，执行平仓
             if stop_triggered or take_profit_triggered or max_hold_triggered or reverse_signal:
                 # 确定平仓价格
                 if stop_triggered:
                     exit_price = stop_price
-                    exit_reason = "止损"
+                    exit_reason = EXIT_STOP
                 elif take_profit_triggered:
                     exit_price = take_profit_price
-                    exit_reason = "止盈"
+                    exit_reason = EXIT_TP
                 elif max_hold_triggered:
                     exit_price = current_price
-                    exit_reason = "最大持有期限"
+                    exit_reason = EXIT_MAXHOLD
                 else:  # reverse_signal
                     exit_price = current_price
-                    exit_reason = "反向信号"
-                
-                # 计算滑点
-                volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1
-                slippage_pct = base_slippage_pct + (market_impact_factor * volume_ratio / 100)
+                    exit_reason = EXIT_REVERSE
                 
-                # 应用滑点
-                if position == 1:  # 多头平仓，卖出
-                    exit_price *= (1 - slippage_pct)
-                else:  # 空头平仓，买入
-                    exit_price *= (1 + slippage_pct)
+                # 应用滑点（开仓时已按持仓方向选好成交价系数列）
+                exit_price *= exit_factor_list[i]
                 
                 # 计算交易数量
                 position_value = capital * risk_per_trade_pct / stop_loss_pct
@@ -278,27 +355,24 @@ def simulate_trades(data: pd.DataFrame, signals: pd.DataFrame,
                 commission = max(min_commission, min(shares * commission_per_share, position_value * max_commission_pct))
                 
                 # 计算交易盈亏
-                if position == 1:  # 多头
-                    profit = shares * (exit_price - entry_price) - commission
-                else:  # 空头
-                    profit = shares * (entry_price - exit_price) - commission
+                profit = shares * position * (exit_price - entry_price) - commission
                 
-                # 更新资金
+                # 平仓前的K线沿用原有资金，平仓当日起使用更新后的资金
+                equity.extend([capital] * (i - equity_filled))
+                equity_filled = i
                 capital += profit
                 
-                # 记录交易
-                trades.append({
-                    'entry_date': entry_date,
-                    'entry_price': entry_price,
-                    'exit_date': current_date,
-                    'exit_price': exit_price,
-                    'position': 'long' if position == 1 else 'short',
-                    'shares': shares,
-                    'profit': profit,
-                    'profit_pct': profit / (shares * entry_price) * 100,
-                    'exit_reason': exit_reason,
-                    'hold_days': days_held
-                })
+                # 记录交易（写入第n_trades行）
+                entry_idx[n_trades] = entry_index
+                exit_idx[n_trades] = i
+                entry_price_arr[n_trades] = entry_price
+                exit_price_arr[n_trades] = exit_price
+                position_arr[n_trades] = position
+                shares_arr[n_trades] = shares
+                profit_arr[n_trades] = profit
+                hold_days_arr[n_trades] = days_held
+                exit_reason_arr[n_trades] = exit_reason
+                n_trades += 1
                 
                 # 平仓后重置持仓状态
                 position = 0
@@ -306,21 +380,97 @@ def simulate_trades(data: pd.DataFrame, signals: pd.DataFrame,
         # 如果没有持仓，检查开仓信号
         if position == 0:
             # 检查买入信号
-            if enhanced_buy_signals.iloc[i]:
-                position = 1  # 多头
-                entry_price = current_price * (1 + base_slippage_pct)  # 考虑滑点
-                entry_date = current_date
+            if buy_signal_list[i]:
+                position = POS_LONG  # 多头
+                entry_price = current_price * long_entry_factor  # 考虑滑点
+                entry_index = i
+                entry_ns = date_ns_list[i]
+                stop_price = entry_price * long_stop_factor
+                take_profit_price = entry_price * long_take_profit_factor
+                adverse_list, favorable_list = low_list, high_list
+                reverse_signal_list, exit_factor_list = sell_signal_list, long_exit_factor_list
             
             # 检查卖出信号 (做空)
-            elif enhanced_sell_signals.iloc[i]:
-                position = -1  # 空头
-                entry_price = current_price * (1 - base_slippage_pct)  # 考虑滑点
-                entry_date = current_date
+            elif sell_signal_list[i]:
+                position = POS_SHORT  # 空头
+                entry_price = current_price * short_entry_factor  # 考虑滑点
+                entry_index = i
+                entry_ns = date_ns_list[i]
+                stop_price = entry_price * short_stop_factor
+                take_profit_price = entry_price * short_take_profit_factor
+                adverse_list, favorable_list = high_list, low_list
+                reverse_signal_list, exit_factor_list = buy_signal_list, short_exit_factor_list
         
-        # 更新权益曲线
-        equity.append(capital)
+        i += 1
+    
+    # 补齐最后一次平仓之后的权益曲线
+    equity.extend([capital] * (n_bars - equity_filled))
+    
+    trade_columns = {
+        'entry_index': entry_idx[:n_trades],
+        'exit_index': exit_idx[:n_trades],
+        'entry_price': entry_price_arr[:n_trades],
+        'exit_price': exit_price_arr[:n_trades],
+        'position': position_arr[:n_trades],
+        'shares': shares_arr[:n_trades],
+        'profit': profit_arr[:n_trades],
+        'profit_pct': profit_arr[:n_trades] / (shares_arr[:n_trades] * entry_price_arr[:n_trades]) * 100,
+        'exit_reason': exit_reason_arr[:n_trades],
+        'hold_days': hold_days_arr[:n_trades]
+    }
+    return trade_columns, equity
+
+
+def _trade_records(trade_columns: Dict[str, np.ndarray], dates: pd.DatetimeIndex) -> List[Dict]:
+    """
+    将列式交易记录转换为逐笔交易字典列表
     
-    return trades, equity
+    参数:
+        trade_columns: _simulate_trade_columns返回的列式交易记录
+        dates: 日期索引
+        
+    返回:
+        List[Dict]: 交易记录列表
+    """
+    entry_dates = dates[trade_columns['entry_index']]
+    exit_dates = dates[trade_columns['exit_index']]
+    return [
+        {
+            'entry_date': entry_date,
+            'entry_price': entry_price,
+            'exit_date': exit_date,
+            'exit_price': exit_price,
+            'position': POSITION_LABELS[position],
+            'shares': shares,
+            'profit': profit,
+            'profit_pct': profit_pct,
+            'exit_reason': EXIT_REASON_LABELS[exit_reason],
+            'hold_days': hold_days
+        }
+        for entry_date, entry_price, exit_date, exit_price, position, shares, profit, profit_pct, exit_reason, hold_days
+        in zip(entry_dates, trade_columns['entry_price'].tolist(),
+               exit_dates, trade_columns['exit_price'].tolist(),
+               trade_columns['position'].tolist(), trade_columns['shares'].tolist(),
+               trade_columns['profit'].tolist(), trade_columns['profit_pct'].tolist(),
+               trade_columns['exit_reason'].tolist(), trade_columns['hold_days'].tolist())
+    ]
+
+
+def _max_run_length(mask: np.ndarray) -> int:
+    """
+    计算布尔数组中连续True的最大长度
+    
+    参数:
+        mask: 布尔数组
+        
+    返回:
+        int: 最长连续True的长度，没有True时为0
+    """
+    if not mask.any():
+        return 0
+    # 两端补0后做差分，+1/-1的位置分别是每段连续True的起点和终点
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.view(np.int8), [0]))))
+    return int((edges[1::2] - edges[::2]).max())
 
 
 def calculate_performance_metrics(trades: List[Dict], equity: List[float], 
@@ -341,34 +491,88 @@ def calculate_performance_metrics(trades: List[Dict], equity: List[float],
     if not trades:
         return get_empty_results()
     
-    # 计算交易统计
-    total_trades = len(trades)
-    winning_trades = [t for t in trades if t['profit'] > 0]
-    losing_trades = [t for t in trades if t['profit'] <= 0]
+    profits = np.fromiter((t['profit'] for t in trades), dtype=np.float64, count=len(trades))
+    hold_days = np.fromiter((t['hold_days'] for t in trades), dtype=np.int64, count=len(trades))
+    return _calculate_metrics_from_arrays(profits, hold_days, equity, initial_capital, dates)
+
+
+def _mean_and_sample_std(values: np.ndarray) -> Tuple[float, float]:
+    """
+    一并计算均值和样本标准差（ddof=1，与pandas默认一致）
     
-    win_rate = len(winning_trades) / total_trades if total_trades > 0 else 0
+    标准差直接复用已算出的均值求离差平方和，运算顺序与ndarray.std相同，结果逐位一致，
+    但省去std内部再求一次均值。
     
-    avg_profit = sum(t['profit'] for t in trades) / total_trades if total_trades > 0 else 0
-    max_profit = max([t['profit'] for t in trades]) if trades else 0
-    max_loss = min([t['profit'] for t in trades]) if trades else 0
+    参数:
+        values: 数值数组
+        
+    返回:
+        Tuple[float, float]: 均值（空数组时为0）和样本标准差（样本数不足2个时为0）
+    """
+    count = len(values)
+    if count == 0:
+        return 0.0, 0.0
+    mean = values.mean()
+    if count < 2:
+        return mean, 0.0
+    deviations = values - mean
+    return mean, float(np.sqrt(np.add.reduce(deviations * deviations) / (count - 1)))
+
+
+def _sample_std(values: np.ndarray) -> float:
+    """
+    计算样本标准差（ddof=1，与pandas默认一致）
     
-    # 计算盈亏比 (Profit Factor)
-    gross_profit = sum(t['profit'] for t in winning_trades) if winning_trades else 0
-    gross_loss = abs(sum(t['profit'] for t in losing_trades)) if losing_trades else 0
-    profit_factor = gross_profit / gross_loss if gross_loss > 0 else 0
+    参数:
+        values: 数值数组
+        
+    返回:
+        float: 样本标准差，样本数不足2个时为0
+    """
+    return _mean_and_sample_std(values)[1]
+
+
+def _calculate_metrics_from_arrays(profits: np.ndarray, hold_days: np.ndarray, equity: List[float],
+                                   initial_capital: float, dates: pd.DatetimeIndex) -> Dict:
+    """
+    基于列式交易记录计算回测性能指标
+    
+    参数:
+        profits: 每笔交易盈亏数组
+        hold_days: 每笔交易持仓天数数组
+        equity: 权益曲线
+        initial_capital: 初始资金
+        dates: 日期索引
+        
+    返回:
+        Dict: 性能指标字典
+    """
+    # 如果没有交易，返回空结果
+    if len(profits) == 0:
+        return get_empty_results()
+    
+    # 计算交易统计（直接在盈亏数组上做归约）
+    total_trades = len(profits)
+    winning = profits > 0
+    winning_count = int(np.count_nonzero(winning))
+    max_profit = float(profits.max())
+    max_loss = float(profits.min())
+    losing = ~winning
+    gross_profit = float(profits[winning].sum())
+    gross_loss = float(profits[losing].sum())
     
     # 计算最大连续亏损次数
-    consecutive_losses = 0
-    max_consecutive_losses = 0
-    for t in trades:
-        if t['profit'] <= 0:
-            consecutive_losses += 1
-            max_consecutive_losses = max(max_consecutive_losses, consecutive_losses)
-        else:
-            consecutive_losses = 0
+    max_consecutive_losses = _max_run_length(losing)
+    
+    win_rate = winning_count / total_trades
+    avg_profit = float(profits.sum()) / total_trades
+    
+    # 计算盈亏比 (Profit Factor)
+    gross_loss = abs(gross_loss)
+    profit_factor = gross_profit / gross_loss if gross_loss > 0 else 0
     
     # 计算平均持仓天数
-    avg_hold_days = sum(t['hold_days'] for t in trades) / total_trades if total_trades > 0 else 0
+    avg_hold_days = int(hold_days.sum()) / total_trades
     
     # 计算最终收益率
     capital = equity[-1]
@@ -377,41 +581,43 @@ def calculate_performance_metrics(trades: List[Dict], equity: List[float],
     # 计算净利润
     net_profit = capital - initial_capital
     
-    # 计算权益曲线的日收益率
-    equity_series = pd.Series(equity)
-    daily_returns = equity_series.pct_change().dropna()
+    # 计算权益曲线的日收益率（直接在NumPy数组上计算，避免构造pandas Series）
+    equity_values = np.asarray(equity, dtype=np.float64)
+    daily_returns = equity_values[1:] / equity_values[:-1] - 1
+    daily_returns = daily_returns[~np.isnan(daily_returns)]
     
     # 计算最大回撤 (Maximum Drawdown)
-    peak = equity_series.expanding().max()
-    drawdown = (equity_series / peak - 1) * 100
-    max_drawdown = abs(drawdown.min())
+    # (x - 1) * 100是单调变换，先对净值/峰值比取最小值再换算成百分比，结果与逐点换算后取最小值相同，
+    # 省去两次整列运算
+    peak = np.maximum.accumulate(equity_values)
+    max_drawdown = abs(((equity_values / peak).min() - 1) * 100)
     
-    # 计算Sharpe比率
+    # 计算Sharpe比率（均值和标准差各只计算一次）
     risk_free_rate = 0.02 / 252  # 假设年化无风险利率为2%，转换为日利率
     excess_returns = daily_returns - risk_free_rate
-    sharpe_ratio = (excess_returns.mean() / excess_returns.std()) * np.sqrt(252) if len(excess_returns) > 0 and excess_returns.std() > 0 else 0
+    excess_mean, excess_std = _mean_and_sample_std(excess_returns)
+    sharpe_ratio = (excess_mean / excess_std) * ANNUALIZATION_FACTOR if excess_std > 0 else 0
     
     # 计算Sortino比率 (只考虑下行风险)
-    downside_returns = excess_returns[excess_returns < 0]
-    downside_std = downside_returns.std() if len(downside_returns) > 0 else 0
+    downside_std = _sample_std(excess_returns[excess_returns < 0])
     
     # 避免除以零的情况
-    if downside_std > 0 and len(excess_returns) > 0:
+    if downside_std > 0:
         try:
-            sortino_ratio = (excess_returns.mean() / downside_std) * np.sqrt(252)
+            sortino_ratio = (excess_mean / downside_std) * ANNUALIZATION_FACTOR
             # 添加合理性检查，使用对数缩放处理异常大的值
             if np.isnan(sortino_ratio) or np.isinf(sortino_ratio):
                 sortino_ratio = 0
             elif abs(sortino_ratio) > 10:
-                # 使用对数缩放，保留正负号
+                # 使用对数缩放，保留正负号（标量运算用math，避免NumPy标量函数的分派开销）
                 sign = 1 if sortino_ratio > 0 else -1
-                sortino_ratio = sign * (2 + np.log10(abs(sortino_ratio) / 10))
+                sortino_ratio = sign * (2 + math.log10(abs(sortino_ratio) / 10))
         except Exception as e:
             logger.warning(f"计算Sortino比率时出错: {str(e)}")
             sortino_ratio = 0
     else:
         # 如果没有下行风险或者收益率为空
-        if len(excess_returns) > 0 and excess_returns.mean() > 0:
+        if excess_mean > 0:
             # 如果有正收益但没有下行风险，使用一个较高但合理的值
             sortino_ratio = 3 + np.random.uniform(0, 1)  # 3到4之间的随机值，表示非常好但不是极端
         else:
@@ -445,7 +651,7 @@ def calculate_performance_metrics(trades: List[Dict], equity: List[float],
     # 限制指标在合理范围内，但使用对数缩放而不是简单截断
     if abs(sharpe_ratio) > 10:
         sign = 1 if sharpe_ratio > 0 else -1
-        sharpe_ratio = sign * (2 + np.log10(abs(sharpe_ratio) / 10))
+        sharpe_ratio = sign * (2 + math.log10(abs(sharpe_ratio) / 10))
     
     # 返回回测结果
     return {
@@ -467,10 +673,68 @@ def calculate_performance_metrics(trades: List[Dict], equity: List[float],
     }
 
 
+def _group_trade_profits(keys: List, profits: np.ndarray) -> List[Tuple]:
+    """
+    按分组键汇总交易笔数、盈利笔数和盈亏合计
+    
+    分组键整列交给np.unique得到每笔交易的分组序号，笔数和盈利笔数用bincount计算，
+    盈亏用np.add.at按交易顺序依次累加（与逐笔累加的结果一致）。
+    
+    参数:
+        keys: 每笔交易的分组键（可哈希且可排序）
+        profits: 每笔交易盈亏数组
+        
+    返回:
+        List[Tuple]: 按分组键首次出现的顺序排列的(分组键, 笔数, 盈利笔数, 盈亏合计)
+    """
+    _, first_seen, group_ids = np.unique(np.asarray(keys), return_index=True, return_inverse=True)
+    group_count = len(first_seen)
+    trade_counts = np.bincount(group_ids, minlength=group_count)
+    winning_counts = np.bincount(group_ids[profits > 0], minlength=group_count)
+    profit_sums = np.zeros(group_count)
+    np.add.at(profit_sums, group_ids, profits)
+    return [
+        (keys[first_seen[group]], int(trade_counts[group]), int(winning_counts[group]), float(profit_sums[group]))
+        for group in np.argsort(first_seen, kind='stable').tolist()
+    ]
+
+
+def _monthly_trade_stats(trades: List[Dict], profits: np.ndarray) -> Dict[str, Dict]:
+    """
+    按平仓月份统计交易次数、盈亏和胜率
+    
+    平仓日期一次性转换为DatetimeIndex，按年月编码分组，不再逐笔调用strftime；
+    月份字符串只为每个出现的月份格式化一次。
+    
+    参数:
+        trades: 交易记录列表
+        profits: 每笔交易盈亏数组
+        
+    返回:
+        Dict[str, Dict]: {年-月: 统计数据}
+    """
+    exit_dates = pd.DatetimeIndex([trade['exit_date'] for trade in trades])
+    # 年月编码（本地时间的年份×12+月份）
+    month_codes = (exit_dates.year * 12 + exit_dates.month - 1).tolist()
+    
+    monthly_performance = {}
+    for code, count, winning_trades, profit in _group_trade_profits(month_codes, profits):
+        year, month = divmod(code, 12)
+        monthly_performance[f"{year:04d}-{month + 1:02d}"] = {
+            'trades': count,
+            'profit': round(profit, 2),
+            'win_rate': round(winning_trades / count * 100, 1),
+            'winning_trades': winning_trades
+        }
+    return monthly_performance
+
+
 def generate_trade_summary(trades: List[Dict]) -> Dict:
     """
     生成交易摘要，包括按月、按交易类型的统计
     
+    盈亏、平仓原因和持仓方向各只从交易记录中取一次为列，三类统计都在列上分组归约。
+    
     参数:
         trades: 交易记录列表
         
@@ -484,73 +748,37 @@ def generate_trade_summary(trades: List[Dict]) -> Dict:
             'position_stats': {}
         }
     
+    profits = np.fromiter((trade['profit'] for trade in trades), dtype=np.float64, count=len(trades))
+    
     # 按月统计
-    monthly_performance = {}
-    for trade in trades:
-        month_key = trade['exit_date'].strftime('%Y-%m')
-        if month_key not in monthly_performance:
-            monthly_performance[month_key] = {
-                'trades': 0,
-                'profit': 0,
-                'win_rate': 0,
-                'winning_trades': 0
-            }
-        
-        monthly_performance[month_key]['trades'] += 1
-        monthly_performance[month_key]['profit'] += trade['profit']
-        if trade['profit'] > 0:
-            monthly_performance[month_key]['winning_trades'] += 1
-    
-    # 计算每月胜率
-    for month, stats in monthly_performance.items():
-        if stats['trades'] > 0:
-            stats['win_rate'] = round(stats['winning_trades'] / stats['trades'] * 100, 1)
-            stats['profit'] = round(stats['profit'], 2)
-    
-    # 按平仓原因统计
+    monthly_performance = _monthly_trade_stats(trades, profits)
+    
+    # 按平仓原因统计，计算每种平仓原因的胜率和平均利润
     exit_reason_stats = {}
-    for trade in trades:
-        reason = trade['exit_reason']
-        if reason not in exit_reason_stats:
-            exit_reason_stats[reason] = {
-                'count': 0,
-                'profit': 0,
-                'avg_profit': 0,
-                'win_rate': 0,
-                'winning_trades': 0
-            }
-        
-        exit_reason_stats[reason]['count'] += 1
-        exit_reason_stats[reason]['profit'] += trade['profit']
-        if trade['profit'] > 0:
-            exit_reason_stats[reason]['winning_trades'] += 1
-    
-    # 计算每种平仓原因的胜率和平均利润
-    for reason, stats in exit_reason_stats.items():
-        if stats['count'] > 0:
-            stats['win_rate'] = round(stats['winning_trades'] / stats['count'] * 100, 1)
-            stats['avg_profit'] = round(stats['profit'] / stats['count'], 2)
-            stats['profit'] = round(stats['profit'], 2)
-    
-    # 按持仓方向统计
+    exit_reasons = [trade['exit_reason'] for trade in trades]
+    for reason, count, winning_trades, profit in _group_trade_profits(exit_reasons, profits):
+        exit_reason_stats[reason] = {
+            'count': count,
+            'profit': round(profit, 2),
+            'avg_profit': round(profit / count, 2),
+            'win_rate': round(winning_trades / count * 100, 1),
+            'winning_trades': winning_trades
+        }
+    
+    # 按持仓方向统计，计算每个持仓方向的胜率和平均利润（没有交易的方向保留零值）
     position_stats = {
         'long': {'count': 0, 'profit': 0, 'win_rate': 0, 'winning_trades': 0},
         'short': {'count': 0, 'profit': 0, 'win_rate': 0, 'winning_trades': 0}
     }
-    
-    for trade in trades:
-        position = trade['position']
-        position_stats[position]['count'] += 1
-        position_stats[position]['profit'] += trade['profit']
-        if trade['profit'] > 0:
-            position_stats[position]['winning_trades'] += 1
-    
-    # 计算每个持仓方向的胜率和平均利润
-    for position, stats in position_stats.items():
-        if stats['count'] > 0:
-            stats['win_rate'] = round(stats['winning_trades'] / stats['count'] * 100, 1)
-            stats['avg_profit'] = round(stats['profit'] / stats['count'], 2)
-            stats['profit'] = round(stats['profit'], 2)
+    positions = [trade['position'] for trade in trades]
+    for position, count, winning_trades, profit in _group_trade_profits(positions, profits):
+        position_stats[position].update(
+            count=count,
+            profit=round(profit, 2),
+            win_rate=round(winning_trades / count * 100, 1),
+            winning_trades=winning_trades,
+            avg_profit=round(profit / count, 2)
+        )
     
     return {
         'monthly_performance': monthly_performance,
@@ -16,6 +16,7 @@ from trademind.core.indicators import (
     calculate_rsi,
     calculate_kdj,
     calculate_bollinger_bands,
+    calculate_moving_averages,
     calculate_dynamic_rsi_thresholds
 )
 
@@ -7,22 +7,23 @@ TradeMind Lite（轻量版）- 分析器模块
 import yfinance as yf
 import pandas as pd
 import numpy as np
-from datetime import datetime
-import pytz
+from datetime import datetime, timedelta
 from pathlib import Path
 import logging
-from typing import Dict, List, Optional, Tuple
-import json
+from typing import Dict, List, Optional, Tuple, Union
 import warnings
 import os
-import sys
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
 
 from trademind.core.indicators import (
     calculate_rsi, 
     calculate_macd, 
     calculate_kdj, 
     calculate_bollinger_bands,
+    calculate_moving_averages,
     calculate_dynamic_rsi_thresholds
 )
 from trademind.core.patterns import identify_candlestick_patterns
@@ -30,12 +31,30 @@ from trademind.core.signals import generate_trading_advice, generate_signals
 from trademind.core.pressure_points import PressurePointAnalyzer
 from trademind.core.trend_analysis import TrendAnalyzer
 from trademind.backtest import run_backtest
+from trademind.data.loader import load_cached_history, save_cached_history
 from trademind.reports.generator import generate_html_report, generate_performance_charts
 
 # 忽略警告
 warnings.filterwarnings('ignore', category=Warning)
 warnings.filterwarnings('ignore', category=RuntimeWarning)
 
+# 趋势方向到UI样式类、箭头和中文名称的查找表（模块级常量，避免每次格式化都重建字典）
+_TREND_CLASSES = {
+    'up': 'trend-up',
+    'down': 'trend-down',
+    'neutral': 'trend-neutral'
+}
+_TREND_ARROWS = {
+    'up': '↑',
+    'down': '↓',
+    'neutral': '→'
+}
+_TREND_LABELS_CN = {
+    'up': '上升',
+    'down': '下降',
+    'neutral': '盘整'
+}
+
 
 class StockAnalyzer:
     """
@@ -49,24 +68,42 @@ class StockAnalyzer:
     - 报告生成
     """
     
-    def __init__(self):
-        """初始化股票分析器"""
+    # 并发分析的最大线程数
+    MAX_WORKERS = 8
+    # 每个线程最多排队的任务数，已提交但未完成的任务总数不超过 线程数 × 该值
+    MAX_PENDING_PER_WORKER = 2
+    # 相邻两次行情请求之间的最小间隔（秒），用于控制对数据源的请求频率
+    REQUEST_INTERVAL = 0.25
+    # 获取历史数据的周期
+    HISTORY_PERIOD = "3y"
+    
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None):
+        """
+        初始化股票分析器
+        
+        参数:
+            cache_dir: 历史数据缓存目录，为None时不使用缓存，每次都从数据源获取
+        """
+        self.cache_path = Path(cache_dir) if cache_dir else None
         self.setup_logging()
         self.setup_paths()
         self.setup_colors()
+        self.setup_rate_limit()
     
     def setup_logging(self):
         """设置日志记录"""
-        log_dir = Path("logs")
-        log_dir.mkdir(exist_ok=True)
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler("logs/stock_analyzer.log", encoding='utf-8'),
-                logging.StreamHandler()
-            ]
-        )
+        # 根日志器已配置时basicConfig不会生效，但作为参数预先创建的FileHandler仍会打开文件，
+        # 每次实例化分析器都会多占用一个文件句柄，因此只在尚未配置时创建日志目录和处理器
+        if not logging.getLogger().handlers:
+            Path("logs").mkdir(exist_ok=True)
+            logging.basicConfig(
+                level=logging.INFO,
+                format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                handlers=[
+                    logging.FileHandler("logs/stock_analyzer.log", encoding='utf-8'),
+                    logging.StreamHandler()
+                ]
+            )
         self.logger = logging.getLogger("stock_analyzer")
     
     def setup_paths(self):
@@ -74,6 +111,26 @@ class StockAnalyzer:
         self.results_path = Path("reports/stocks")
         self.results_path.mkdir(parents=True, exist_ok=True)
     
+    def setup_rate_limit(self):
+        """设置行情请求限速（多线程共享）"""
+        self._request_lock = threading.Lock()
+        self._next_request_time = 0.0
+        # 批量预取的历史数据，供本轮分析中的get_stock_data直接使用
+        self._prefetched_data: Dict[str, pd.DataFrame] = {}
+    
+    def _wait_for_request_slot(self):
+        """
+        等待下一个可用的请求时间片
+        
+        各线程按REQUEST_INTERVAL依次错开发起请求，替代原先每只股票分析后固定sleep的串行限速。
+        """
+        with self._request_lock:
+            now = time.monotonic()
+            wait_time = self._next_request_time - now
+            self._next_request_time = max(now, self._next_request_time) + self.REQUEST_INTERVAL
+        if wait_time > 0:
+            time.sleep(wait_time)
+    
     def setup_colors(self):
         """设置颜色方案"""
         self.colors = {
@@ -96,13 +153,19 @@ class StockAnalyzer:
             "neutral": "#FFA000"
         }
     
-    def analyze_stocks(self, symbols: List[str], names: Dict[str, str] = None) -> List[Dict]:
+    def analyze_stocks(self, symbols: List[str], names: Dict[str, str] = None,
+                       max_workers: Optional[int] = None) -> List[Dict]:
         """
         分析多只股票
         
+        各股票之间相互独立，使用线程池并发执行（数据获取为I/O密集型，
+        请求频率由get_stock_data中的限速控制），结果按输入顺序返回。
+        已提交未完成的任务数有上限，完成一批再补充提交，股票很多时不会一次创建全部任务。
+        
         参数:
             symbols: 股票代码列表
             names: 股票名称字典，格式为 {代码: 名称}
+            max_workers: 最大并发线程数，默认为min(MAX_WORKERS, 股票数量)
             
         返回:
             List[Dict]: 分析结果列表
@@ -110,139 +173,241 @@ class StockAnalyzer:
         if names is None:
             names = {}
             
-        results = []
         total = len(symbols)
         print("\n开始技术分析...")
+        if total == 0:
+            return []
         
-        for index, symbol in enumerate(symbols, 1):
-            try:
-                print(f"\n[{index}/{total} - {index/total*100:.1f}%] 分析: {names.get(symbol, symbol)} ({symbol})")
-                
-                # 获取股票数据
-                hist = self.get_stock_data(symbol)
-                
-                if hist.empty:
-                    print(f"⚠️ 无法获取 {symbol} 的数据，跳过")
-                    continue
-                
-                # 确保有足够的数据计算价格变化
-                if len(hist) >= 2:
+        workers = max_workers or min(self.MAX_WORKERS, total)
+        ordered_results: List[Optional[Dict]] = [None] * total
+        
+        # 多只股票时先用一次批量请求获取历史数据，未取到的股票在分析时再单独请求
+        self.prefetch_stock_data(symbols)
+        
+        try:
+            queued = enumerate(symbols)
+            max_pending = workers * self.MAX_PENDING_PER_WORKER
+            pending = {}
+            completed = 0
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                while True:
+                    # 补充提交任务，使未完成的任务数保持在上限以内
+                    for index, symbol in islice(queued, max_pending - len(pending)):
+                        pending[executor.submit(self._analyze_symbol, symbol, names)] = index
+                    if not pending:
+                        break
+                    
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        index = pending.pop(future)
+                        completed += 1
+                        ordered_results[index] = future.result()
+                        status = "✅" if ordered_results[index] is not None else "❌"
+                        print(f"[{completed}/{total} - {completed/total*100:.1f}%] {status} {names.get(symbols[index], symbols[index])} ({symbols[index]})")
+        finally:
+            self._prefetched_data = {}
+        
+        return [result for result in ordered_results if result is not None]
+    
+    def prefetch_stock_data(self, symbols: List[str]) -> int:
+        """
+        批量下载多只股票的历史数据
+        
+        使用yf.download一次请求获取所有股票，结果暂存在分析器中供get_stock_data使用；
+        已有当日缓存的股票不再下载，检查时读出的缓存数据同样暂存，分析时不再重复读取缓存文件。
+        数据不足或缺失的股票不预取，分析时按单只股票重新获取。
+        
+        参数:
+            symbols: 股票代码列表
+            
+        返回:
+            int: 成功批量下载的股票数量
+        """
+        pending = list(dict.fromkeys(symbols))
+        prefetched = {}
+        if self.cache_path is not None:
+            uncached = []
+            for symbol in pending:
+                hist = load_cached_history(self.cache_path, symbol, self.HISTORY_PERIOD)
+                if hist is None:
+                    uncached.append(symbol)
+                else:
+                    prefetched[symbol] = hist
+            pending = uncached
+        # 先暂存已读出的缓存数据，批量下载失败时也不必重新读取
+        self._prefetched_data = prefetched
+        if len(pending) < 2:
+            return 0
+        
+        try:
+            self._wait_for_request_slot()
+            # yfinance对日线批量下载默认ignore_tz=True（返回无时区索引），显式保留交易所时区，
+            # 与单只获取的Ticker.history一致，预取与否得到的索引类型相同
+            bulk = yf.download(pending, period=self.HISTORY_PERIOD, group_by='ticker',
+                               auto_adjust=True, actions=True, threads=True, progress=False,
+                               ignore_tz=False)
+        except Exception as e:
+            self.logger.warning(f"批量下载历史数据失败，将逐个获取: {str(e)}")
+            return 0
+        
+        if bulk is None or bulk.empty or not isinstance(bulk.columns, pd.MultiIndex):
+            return 0
+        
+        downloaded = 0
+        available = set(bulk.columns.get_level_values(0))
+        for symbol in pending:
+            if symbol not in available:
+                continue
+            hist = bulk[symbol].dropna(how='all')
+            # 缺少必要列或数据不足时交给get_stock_data单独获取（其中包含获取最大可用数据的重试）
+            if not {'Open', 'High', 'Low', 'Close'}.issubset(hist.columns) or len(hist) < 100:
+                continue
+            prefetched[symbol] = hist
+            downloaded += 1
+            if self.cache_path is not None:
+                save_cached_history(self.cache_path, symbol, self.HISTORY_PERIOD, hist)
+        
+        return downloaded
+    
+    def _analyze_symbol(self, symbol: str, names: Dict[str, str]) -> Optional[Dict]:
+        """
+        分析单只股票：获取数据、计算指标、识别形态、生成建议并回测
+        
+        参数:
+            symbol: 股票代码
+            names: 股票名称字典，格式为 {代码: 名称}
+            
+        返回:
+            Optional[Dict]: 分析结果，获取数据失败或分析出错时返回None
+        """
+        try:
+            # 本方法在工作线程中并发执行：逐步进度带股票代码写入日志，不打印到控制台，
+            # 控制台只保留主线程按完成顺序输出的一行进度
+            self.logger.debug(f"[{symbol}] 开始分析: {names.get(symbol, symbol)}")
+            
+            # 获取股票数据
+            hist = self.get_stock_data(symbol)
+            
+            if hist.empty:
+                self.logger.warning(f"[{symbol}] 无法获取数据，跳过")
+                return None
+            
+            # 涨跌幅计算过程先收集起来，最后作为一条日志写出，多线程并发分析时不会与其他股票交错
+            change_log = []
+            
+            # 确保有足够的数据计算价格变化
+            if len(hist) >= 2:
+                current_price = hist['Close'].iloc[-1]
+                prev_price = hist['Close'].iloc[-2]
+                price_change = current_price - prev_price
+                # 确保除数不为零
+                if prev_price > 0:
+                    price_change_pct = (price_change / prev_price) * 100
+                    # 记录调试信息
+                    change_log.append(f"计算涨跌幅 - 当前价格: {current_price:.2f}, 前一收盘价: {prev_price:.2f}")
+                    change_log.append(f"计算涨跌幅 - 价格变化: {price_change:.2f}, 变化百分比: {price_change_pct:.2f}%")
+                else:
+                    price_change_pct = 0.0
+                    change_log.append(f"计算涨跌幅 - 前一收盘价为零或负值: {prev_price:.2f}, 使用默认值0.0%")
+            else:
+                # 如果只有一天数据，尝试使用当天的开盘价和收盘价
+                if not hist.empty:
                     current_price = hist['Close'].iloc[-1]
-                    prev_price = hist['Close'].iloc[-2]
+                    prev_price = hist['Open'].iloc[-1]
                     price_change = current_price - prev_price
                     # 确保除数不为零
                     if prev_price > 0:
                         price_change_pct = (price_change / prev_price) * 100
-                        # 打印调试信息
-                        print(f"计算涨跌幅 - 当前价格: {current_price:.2f}, 前一收盘价: {prev_price:.2f}")
-                        print(f"计算涨跌幅 - 价格变化: {price_change:.2f}, 变化百分比: {price_change_pct:.2f}%")
+                        change_log.append(f"计算涨跌幅(单日) - 收盘价: {current_price:.2f}, 开盘价: {prev_price:.2f}")
+                        change_log.append(f"计算涨跌幅(单日) - 价格变化: {price_change:.2f}, 变化百分比: {price_change_pct:.2f}%")
                     else:
                         price_change_pct = 0.0
-                        print(f"计算涨跌幅 - 前一收盘价为零或负值: {prev_price:.2f}, 使用默认值0.0%")
+                        change_log.append(f"计算涨跌幅(单日) - 开盘价为零或负值: {prev_price:.2f}, 使用默认值0.0%")
                 else:
-                    # 如果只有一天数据，尝试使用当天的开盘价和收盘价
-                    if not hist.empty:
-                        current_price = hist['Close'].iloc[-1]
-                        prev_price = hist['Open'].iloc[-1]
-                        price_change = current_price - prev_price
-                        # 确保除数不为零
-                        if prev_price > 0:
-                            price_change_pct = (price_change / prev_price) * 100
-                            print(f"计算涨跌幅(单日) - 收盘价: {current_price:.2f}, 开盘价: {prev_price:.2f}")
-                            print(f"计算涨跌幅(单日) - 价格变化: {price_change:.2f}, 变化百分比: {price_change_pct:.2f}%")
-                        else:
-                            price_change_pct = 0.0
-                            print(f"计算涨跌幅(单日) - 开盘价为零或负值: {prev_price:.2f}, 使用默认值0.0%")
-                    else:
-                        current_price = 0.0
-                        prev_price = 0.0
-                        price_change = 0.0
-                        price_change_pct = 0.0
-                        print("计算涨跌幅 - 无历史数据，使用默认值0.0%")
-                
-                # 确保价格变化百分比不是NaN或无穷大
-                if pd.isna(price_change_pct) or np.isinf(price_change_pct):
+                    current_price = 0.0
+                    prev_price = 0.0
+                    price_change = 0.0
                     price_change_pct = 0.0
-                    print(f"计算涨跌幅 - 结果为NaN或无穷大，使用默认值0.0%")
-                
-                # 打印最终使用的涨跌幅
-                print(f"最终涨跌幅: {price_change_pct:.2f}%")
-                
-                print("计算技术指标...")
-                # 计算技术指标
-                indicators = self.calculate_indicators(hist)
-                
-                print("分析K线形态...")
-                # 调用形态识别模块
-                patterns = self.identify_patterns(hist.tail(5))
-                
-                print("生成交易建议...")
-                # 调用信号生成模块
-                advice = generate_trading_advice(indicators, current_price, patterns)
-                
-                print("执行策略回测...")
-                # 生成交易信号
-                signals = generate_signals(hist, indicators)
-                
-                # 调用回测模块
-                backtest_results = run_backtest(hist, signals)
-                
-                # 确保回测结果包含所有必要的字段
-                if 'total_trades' not in backtest_results or backtest_results['total_trades'] == 0:
-                    # 如果没有足够的数据进行回测，提供一些基本信息
-                    backtest_results = {
-                        'total_trades': 0,
-                        'win_rate': 0,
-                        'avg_profit': 0.00,
-                        'max_profit': 0.00,
-                        'max_loss': 0.00,
-                        'profit_factor': 0.00,
-                        'max_drawdown': 0.00,
-                        'consecutive_losses': 0,
-                        'avg_hold_days': 0,
-                        'final_return': 0.00,
-                        'sharpe_ratio': 0.00,
-                        'sortino_ratio': 0.00,
-                        'net_profit': 0.00,
-                        'annualized_return': 0.00
-                    }
-                
-                # 添加压力位和趋势分析
-                print("分析压力位和趋势...")
-                pressure_trend_result = self.analyze_pressure_and_trend(symbol)
-                
-                # 创建基本结果字典
-                result = {
-                    'symbol': symbol,
-                    'name': names.get(symbol, symbol),
-                    'price': current_price,
-                    'price_change': price_change,
-                    'price_change_pct': price_change_pct,
-                    'prev_close': prev_price,
-                    'indicators': indicators,
-                    'patterns': patterns,
-                    'advice': advice,
-                    'backtest': backtest_results
+                    change_log.append("计算涨跌幅 - 无历史数据，使用默认值0.0%")
+            
+            # 确保价格变化百分比不是NaN或无穷大
+            if pd.isna(price_change_pct) or np.isinf(price_change_pct):
+                price_change_pct = 0.0
+                change_log.append(f"计算涨跌幅 - 结果为NaN或无穷大，使用默认值0.0%")
+            
+            # 记录最终使用的涨跌幅
+            change_log.append(f"最终涨跌幅: {price_change_pct:.2f}%")
+            self.logger.debug(f"[{symbol}] " + "\n".join(change_log))
+            
+            self.logger.debug(f"[{symbol}] 计算技术指标...")
+            # 计算技术指标
+            indicators = self.calculate_indicators(hist)
+            
+            self.logger.debug(f"[{symbol}] 分析K线形态...")
+            # 调用形态识别模块
+            patterns = self.identify_patterns(hist.tail(5))
+            
+            self.logger.debug(f"[{symbol}] 生成交易建议...")
+            # 调用信号生成模块
+            advice = generate_trading_advice(indicators, current_price, patterns)
+            
+            self.logger.debug(f"[{symbol}] 执行策略回测...")
+            # 生成交易信号
+            signals = generate_signals(hist, indicators)
+            
+            # 调用回测模块
+            backtest_results = run_backtest(hist, signals)
+            
+            # 确保回测结果包含所有必要的字段
+            if 'total_trades' not in backtest_results or backtest_results['total_trades'] == 0:
+                # 如果没有足够的数据进行回测，提供一些基本信息
+                backtest_results = {
+                    'total_trades': 0,
+                    'win_rate': 0,
+                    'avg_profit': 0.00,
+                    'max_profit': 0.00,
+                    'max_loss': 0.00,
+                    'profit_factor': 0.00,
+                    'max_drawdown': 0.00,
+                    'consecutive_losses': 0,
+                    'avg_hold_days': 0,
+                    'final_return': 0.00,
+                    'sharpe_ratio': 0.00,
+                    'sortino_ratio': 0.00,
+                    'net_profit': 0.00,
+                    'annualized_return': 0.00
                 }
-                
-                # 将压力位和趋势分析结果整合到最终结果中
-                if pressure_trend_result:
-                    # 获取UI需要的格式化数据
-                    ui_data = self._prepare_pressure_trend_for_report(pressure_trend_result)
-                    # 合并到主结果中
-                    result.update(ui_data)
-                
-                results.append(result)
-                
-                print(f"✅ {symbol} 分析完成")
-                time.sleep(0.5)
-                
-            except Exception as e:
-                self.logger.error(f"分析 {symbol} 时出错", exc_info=True)
-                print(f"❌ {symbol} 分析失败: {str(e)}")
-                continue
-        
-        return results
+            
+            # 添加压力位和趋势分析
+            self.logger.debug(f"[{symbol}] 分析压力位和趋势...")
+            pressure_trend_result = self.analyze_pressure_and_trend(symbol, hist)
+            
+            # 创建基本结果字典
+            result = {
+                'symbol': symbol,
+                'name': names.get(symbol, symbol),
+                'price': current_price,
+                'price_change': price_change,
+                'price_change_pct': price_change_pct,
+                'prev_close': prev_price,
+                'indicators': indicators,
+                'patterns': patterns,
+                'advice': advice,
+                'backtest': backtest_results
+            }
+            
+            # 将压力位和趋势分析结果整合到最终结果中
+            if pressure_trend_result:
+                # 获取UI需要的格式化数据
+                ui_data = self._prepare_pressure_trend_for_report(pressure_trend_result, symbol)
+                # 合并到主结果中
+                result.update(ui_data)
+            
+            return result
+            
+        except Exception as e:
+            self.logger.error(f"[{symbol}] 分析失败: {str(e)}", exc_info=True)
+            return None
     
     def generate_report(self, results: List[Dict], title: str = "股票分析报告") -> str:
         """
@@ -281,6 +446,30 @@ class StockAnalyzer:
         
         return report_path
     
+    def _scan_report_files(self) -> List[Tuple[str, float]]:
+        """
+        扫描报告目录中的HTML报告文件
+        
+        主报告目录只扫描当前层，stocks子目录递归扫描。使用os.scandir，
+        每个文件只取一次stat。
+        
+        返回:
+            List[Tuple[str, float]]: (文件路径, 修改时间戳) 列表
+        """
+        report_files = []
+        pending_dirs = [(str(self.results_path), False)]
+        
+        while pending_dirs:
+            directory, recursive = pending_dirs.pop()
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.html') and entry.is_file():
+                        report_files.append((entry.path, entry.stat().st_mtime))
+                    elif entry.is_dir(follow_symlinks=False) and (recursive or entry.name == 'stocks'):
+                        pending_dirs.append((entry.path, True))
+        
+        return report_files
+
     def clean_reports(self, days_threshold: int = 30):
         """
         清理旧的报告文件
@@ -292,90 +481,64 @@ class StockAnalyzer:
             print("报告目录不存在")
             return 0
         
-        now = datetime.now()
         count = 0
         
         # 打印调试信息
         print(f"开始清理报告，阈值: {days_threshold if days_threshold is not None else '全部删除'}天")
         print(f"报告目录: {self.results_path}")
         
-        # 检查stocks子目录
-        stocks_path = self.results_path / "stocks"
-        if stocks_path.exists():
-            print(f"股票报告目录: {stocks_path}")
+        # 扫描主报告目录和stocks子目录（递归）中的HTML文件，同时取得修改时间
+        report_files = self._scan_report_files()
         
-        # 递归遍历目录，找出所有HTML文件
-        all_files = []
+        print(f"找到 {len(report_files)} 个报告文件")
         
-        # 主报告目录中的HTML文件
-        main_html_files = list(self.results_path.glob("*.html"))
-        all_files.extend(main_html_files)
-        
-        # stocks子目录中的HTML文件
-        if stocks_path.exists():
-            stocks_html_files = list(stocks_path.glob("*.html"))
-            all_files.extend(stocks_html_files)
-            
-            # 递归查找子目录中的文件
-            for subdir in stocks_path.glob("**/"):
-                if subdir != stocks_path:  # 避免重复
-                    subdir_files = list(subdir.glob("*.html"))
-                    all_files.extend(subdir_files)
-        
-        print(f"找到 {len(all_files)} 个报告文件")
+        # 过滤出需要删除的文件：只比较扫描时取得的修改时间戳，不逐个构造datetime
+        if days_threshold is None:
+            expired_files = [path for path, _ in report_files]
+        else:
+            # 文件年龄按完整天数计，超过阈值天数（即已满days_threshold+1天）才删除
+            threshold_ts = (datetime.now() - timedelta(days=days_threshold + 1)).timestamp()
+            expired_files = [path for path, mtime in report_files if mtime <= threshold_ts]
         
-        for file in all_files:
+        # 逐个删除，不逐文件打印：每删除100个输出一次进度，失败信息汇总后统一输出
+        errors = []
+        for file in expired_files:
             try:
-                file_time = datetime.fromtimestamp(file.stat().st_mtime)
-                days_old = (now - file_time).days
-                
-                print(f"检查文件: {file.name}, 创建于: {file_time}, 已有 {days_old} 天")
-                
-                # 如果days_threshold为None或者文件超过阈值天数，则删除
-                if days_threshold is None or days_old > days_threshold:
-                    print(f"删除文件: {file}")
-                    # 确保文件存在且可写
-                    if file.exists():
-                        try:
-                            # 使用os.remove而不是Path.unlink，可能更可靠
-                            os.remove(str(file))
-                            count += 1
-                            print(f"已删除文件: {file}")
-                        except PermissionError:
-                            # 尝试修改权限后再删除
-                            try:
-                                os.chmod(str(file), 0o666)  # 设置读写权限
-                                os.remove(str(file))
-                                count += 1
-                                print(f"修改权限后已删除文件: {file}")
-                            except Exception as e2:
-                                print(f"修改权限后仍无法删除文件 {file}: {str(e2)}")
-                                
-                                # 尝试使用系统命令删除
-                                try:
-                                    import subprocess
-                                    if os.name == 'nt':  # Windows
-                                        cmd = f'del /F /Q "{file}"'
-                                    else:  # Unix/Linux/Mac
-                                        cmd = f'rm -f "{file}"'
-                                    
-                                    print(f"尝试使用系统命令删除: {cmd}")
-                                    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-                                    
-                                    if result.returncode == 0:
-                                        count += 1
-                                        print(f"使用系统命令成功删除文件: {file}")
-                                    else:
-                                        print(f"系统命令删除失败: {result.stderr}")
-                                except Exception as e3:
-                                    print(f"使用系统命令删除失败: {str(e3)}")
-                        except Exception as e:
-                            print(f"删除文件失败: {str(e)}")
-                    else:
-                        print(f"文件不存在: {file}")
+                os.unlink(file)
+            except FileNotFoundError:
+                continue
+            except PermissionError:
+                # 尝试修改权限后再删除
+                try:
+                    os.chmod(file, 0o666)  # 设置读写权限
+                    os.unlink(file)
+                except Exception as e2:
+                    # 尝试使用系统命令删除
+                    try:
+                        import subprocess
+                        if os.name == 'nt':  # Windows
+                            cmd = f'del /F /Q "{file}"'
+                        else:  # Unix/Linux/Mac
+                            cmd = f'rm -f "{file}"'
+                        
+                        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+                        if result.returncode != 0:
+                            errors.append((file, f"{str(e2)}; 系统命令删除失败: {result.stderr.strip()}"))
+                            continue
+                    except Exception as e3:
+                        errors.append((file, f"{str(e2)}; 系统命令删除失败: {str(e3)}"))
+                        continue
             except Exception as e:
-                print(f"处理文件 {file} 时出错: {str(e)}")
-                self.logger.error(f"处理文件 {file} 时出错: {str(e)}")
+                errors.append((file, str(e)))
+                continue
+            
+            count += 1
+            if count % 100 == 0:
+                print(f"  ...已删除 {count} 个")
+        
+        for file, error in errors:
+            print(f"删除文件失败 {file}: {error}")
+            self.logger.error(f"删除文件 {file} 失败: {error}")
         
         print(f"已删除 {count} 个{'所有' if days_threshold is None else f'超过 {days_threshold} 天的旧'}报告")
         return count  # 返回删除的文件数量，方便前端显示
@@ -515,6 +678,7 @@ class StockAnalyzer:
             Dict: 股票信息
         """
         try:
+            self._wait_for_request_slot()
             stock = yf.Ticker(symbol)
             info = stock.info
             return info
@@ -533,20 +697,35 @@ class StockAnalyzer:
             pd.DataFrame: 股票历史数据
         """
         try:
+            # 优先使用批量预取的数据
+            hist = self._prefetched_data.get(symbol)
+            if hist is not None:
+                return hist
+            
+            # 其次使用当日缓存，避免重复请求数据源
+            if self.cache_path is not None:
+                hist = load_cached_history(self.cache_path, symbol, self.HISTORY_PERIOD)
+                if hist is not None:
+                    return hist
+            
             # 获取更长时间的历史数据，确保有足够的数据进行回测
+            self._wait_for_request_slot()
             stock = yf.Ticker(symbol)
             # 从2年的数据改为3年，确保有足够的数据进行回测
-            hist = stock.history(period="3y")
+            hist = stock.history(period=self.HISTORY_PERIOD)
             
             if hist.empty or len(hist) < 100:  # 确保至少有100个交易日的数据
-                print(f"⚠️ {symbol} 的历史数据不足，尝试获取最大可用数据")
-                # 尝试获取最大可用数据
+                self.logger.debug(f"[{symbol}] 历史数据不足，尝试获取最大可用数据")
+                # 尝试获取最大可用数据（重试同样是一次请求，需经过限速）
+                self._wait_for_request_slot()
                 hist = stock.history(period="max")
             
+            if self.cache_path is not None:
+                save_cached_history(self.cache_path, symbol, self.HISTORY_PERIOD, hist)
+            
             return hist
         except Exception as e:
-            self.logger.error(f"获取 {symbol} 的历史数据时出错: {str(e)}")
-            print(f"❌ 获取 {symbol} 的历史数据失败: {str(e)}")
+            self.logger.error(f"[{symbol}] 获取历史数据时出错: {str(e)}")
             return pd.DataFrame()
 
     def calculate_indicators(self, data: pd.DataFrame) -> Dict:
@@ -577,12 +756,8 @@ class StockAnalyzer:
             # 计算布林带
             bb_upper, bb_middle, bb_lower, bb_width, bb_percent = calculate_bollinger_bands(data['Close'])
             
-            # 计算移动平均线
-            sma5 = data['Close'].rolling(window=5).mean()
-            sma10 = data['Close'].rolling(window=10).mean()
-            sma20 = data['Close'].rolling(window=20).mean()
-            sma50 = data['Close'].rolling(window=50).mean()
-            sma200 = data['Close'].rolling(window=200).mean()
+            # 计算移动平均线（各周期共用一次前缀和计算）
+            moving_averages = calculate_moving_averages(data['Close'], (5, 10, 20, 50, 200))
             
             # 构建指标字典
             indicators = {
@@ -602,17 +777,16 @@ class StockAnalyzer:
                     'bandwidth': bb_width,
                     'percent_b': bb_percent
                 },
-                'sma5': sma5,
-                'sma10': sma10,
-                'sma20': sma20,
-                'sma50': sma50,
-                'sma200': sma200
+                'sma5': moving_averages[5],
+                'sma10': moving_averages[10],
+                'sma20': moving_averages[20],
+                'sma50': moving_averages[50],
+                'sma200': moving_averages[200]
             }
             
             return indicators
         except Exception as e:
             self.logger.error(f"计算技术指标时出错: {str(e)}")
-            print(f"❌ 计算技术指标失败: {str(e)}")
             return {}
 
     def identify_patterns(self, data: pd.DataFrame) -> List:
@@ -625,8 +799,6 @@ class StockAnalyzer:
         返回:
             List: 识别出的K线形态列表
         """
-        from trademind.core.patterns import identify_candlestick_patterns
-        
         try:
             # 确保数据足够进行形态识别
             if len(data) < 5:
@@ -932,30 +1104,30 @@ class StockAnalyzer:
         # 这里需要根据实际的回测逻辑来实现
         return {} 
 
-    def analyze_pressure_and_trend(self, symbol: str) -> Dict:
+    def analyze_pressure_and_trend(self, symbol: str, data: Optional[pd.DataFrame] = None) -> Dict:
         """
         分析股票的压力位和趋势
         
         参数:
             symbol: 股票代码
+            data: 已获取的股票历史数据，为None时按symbol重新获取
             
         返回:
             Dict: 包含压力位和趋势分析结果的字典
         """
         try:
-            # 获取股票数据
-            data = self.get_stock_data(symbol)
+            # 获取股票数据（批量分析时直接复用调用方已取得的数据）
+            if data is None:
+                data = self.get_stock_data(symbol)
             if data.empty:
                 return {}
                 
             # 计算压力位
-            from trademind.core.pressure_points import PressurePointAnalyzer
             pressure_analyzer = PressurePointAnalyzer(data)
             pressure_points = pressure_analyzer.analyze()
             
             # 计算趋势
-            from trademind.core.trend_analysis import TrendAnalyzer
-            trend_analyzer = TrendAnalyzer(data)
+            trend_analyzer = TrendAnalyzer(data, symbol)
             trend_analysis = trend_analyzer.analyze()
             
             # 获取当前价格
@@ -967,8 +1139,8 @@ class StockAnalyzer:
             # 计算ADX数据并确保有有效值
             adx_data = trend_analyzer.calculate_adx()
             
-            # 打印详细的ADX计算结果，便于调试
-            print(f"计算ADX结果(详细): {adx_data}")
+            # 记录详细的ADX计算结果，便于调试（工作线程中执行，写入日志而不打印）
+            self.logger.debug(f"[{symbol}] 计算ADX结果(详细): {adx_data}")
             
             # 确保ADX值不为零
             adx_value = adx_data.get('adx', 0.0)
@@ -977,13 +1149,13 @@ class StockAnalyzer:
             
             if adx_value == 0.0:
                 adx_value = 15.0  # 使用默认值
-                print("ADX值为零，使用默认值15.0")
+                self.logger.debug(f"[{symbol}] ADX值为零，使用默认值15.0")
             if plus_di_value == 0.0:
                 plus_di_value = 10.0
-                print("+DI值为零，使用默认值10.0")
+                self.logger.debug(f"[{symbol}] +DI值为零，使用默认值10.0")
             if minus_di_value == 0.0:
                 minus_di_value = 10.0
-                print("-DI值为零，使用默认值10.0")
+                self.logger.debug(f"[{symbol}] -DI值为零，使用默认值10.0")
             
             # 整合结果
             result = {
@@ -1003,11 +1175,11 @@ class StockAnalyzer:
             # 添加状态标志
             result['status'] = 'success'
             
-            print(f"压力位和趋势分析完成，ADX值: {adx_value}, +DI: {plus_di_value}, -DI: {minus_di_value}")
+            self.logger.debug(f"[{symbol}] 压力位和趋势分析完成，ADX值: {adx_value}, +DI: {plus_di_value}, -DI: {minus_di_value}")
             return result
             
         except Exception as e:
-            self.logger.error(f"分析压力位和趋势时出错: {str(e)}", exc_info=True)
+            self.logger.error(f"[{symbol}] 分析压力位和趋势时出错: {str(e)}", exc_info=True)
             return {'status': 'error', 'message': str(e)}
 
     def _generate_recommendation(self, pressure_points: Dict, trend_analysis: Dict, current_price: float) -> Dict:
@@ -1122,53 +1294,22 @@ class StockAnalyzer:
         trend_strength = trend_analysis['strength']
         
         # 设置趋势方向的样式类和箭头
-        trend_class = {
-            'up': 'trend-up',
-            'down': 'trend-down',
-            'neutral': 'trend-neutral'
-        }.get(trend_direction, 'trend-neutral')
-        
-        trend_arrow = {
-            'up': '↑',
-            'down': '↓',
-            'neutral': '→'
-        }.get(trend_direction, '→')
+        trend_class = _TREND_CLASSES.get(trend_direction, 'trend-neutral')
+        trend_arrow = _TREND_ARROWS.get(trend_direction, '→')
         
         # 翻译趋势方向为中文
-        trend_direction_cn = {
-            'up': '上升',
-            'down': '下降',
-            'neutral': '盘整'
-        }.get(trend_direction, '盘整')
+        trend_direction_cn = _TREND_LABELS_CN.get(trend_direction, '盘整')
         
         # 设置道氏理论相关的类
         primary_trend = trend_analysis['dow_theory']['primary_trend']
         secondary_trend = trend_analysis['dow_theory']['secondary_trend']
         
-        primary_trend_class = {
-            'up': 'trend-up',
-            'down': 'trend-down',
-            'neutral': 'trend-neutral'
-        }.get(primary_trend, 'trend-neutral')
-        
-        secondary_trend_class = {
-            'up': 'trend-up',
-            'down': 'trend-down',
-            'neutral': 'trend-neutral'
-        }.get(secondary_trend, 'trend-neutral')
+        primary_trend_class = _TREND_CLASSES.get(primary_trend, 'trend-neutral')
+        secondary_trend_class = _TREND_CLASSES.get(secondary_trend, 'trend-neutral')
         
         # 翻译道氏理论趋势为中文
-        primary_trend_cn = {
-            'up': '上升',
-            'down': '下降',
-            'neutral': '盘整'
-        }.get(primary_trend, '盘整')
-        
-        secondary_trend_cn = {
-            'up': '上升',
-            'down': '下降',
-            'neutral': '盘整'
-        }.get(secondary_trend, '盘整')
+        primary_trend_cn = _TREND_LABELS_CN.get(primary_trend, '盘整')
+        secondary_trend_cn = _TREND_LABELS_CN.get(secondary_trend, '盘整')
         
         # 获取ADX值
         adx = trend_analysis['adx']['adx']
@@ -1211,12 +1352,13 @@ class StockAnalyzer:
             'fibonacci_levels': pressure_points['fibonacci_levels']
         }
 
-    def _prepare_pressure_trend_for_report(self, pressure_trend_result: Dict) -> Dict:
+    def _prepare_pressure_trend_for_report(self, pressure_trend_result: Dict, symbol: str = '') -> Dict:
         """
         为报告准备压力位和趋势分析数据
         
         参数:
             pressure_trend_result: analyze_pressure_and_trend的结果
+            symbol: 股票代码，仅用于日志前缀
             
         返回:
             Dict: 格式化后的报告数据
@@ -1261,9 +1403,9 @@ class StockAnalyzer:
             report_data['plus_di'] = plus_di_value
             report_data['minus_di'] = minus_di_value
             
-            print(f"在analyzer._prepare_pressure_trend_for_report中设置ADX: {adx_value}, +DI: {plus_di_value}, -DI: {minus_di_value}")
+            self.logger.debug(f"[{symbol}] 在analyzer._prepare_pressure_trend_for_report中设置ADX: {adx_value}, +DI: {plus_di_value}, -DI: {minus_di_value}")
         else:
-            print(f"未找到ADX数据或格式不正确: {adx_data}")
+            self.logger.debug(f"[{symbol}] 未找到ADX数据或格式不正确: {adx_data}")
             
         # 在报告数据中添加标记，表示包含压力位和趋势分析
         report_data['has_pressure_trend_analysis'] = True
@@ -7,8 +7,58 @@
 
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from trademind.core.indicators import calculate_rsi
 
+
+def _rolling_last_percentile(values, window):
+    """
+    计算滚动窗口内最后一个值的百分位排名
+    
+    等价于 rolling(window).apply(lambda x: pd.Series(x).rank(pct=True).iloc[-1])，
+    并列值按平均排名处理，含NaN的窗口结果为NaN，但整体在NumPy中一次完成。
+    
+    参数:
+    values (Series): 输入序列
+    window (int): 滚动窗口大小
+    
+    返回:
+    Series: 百分位排名序列
+    """
+    arr = values.to_numpy(dtype=np.float64)
+    result = np.full(len(arr), np.nan)
+    
+    if len(arr) >= window:
+        windows = sliding_window_view(arr, window)
+        last = windows[:, -1:]
+        less = (windows < last).sum(axis=1)
+        equal = (windows == last).sum(axis=1)
+        ranks = (less + (equal + 1) / 2) / window
+        valid = ~np.isnan(windows).any(axis=1)
+        result[window - 1:] = np.where(valid, ranks, np.nan)
+    
+    return pd.Series(result, index=values.index)
+
+def _simple_returns(close):
+    """
+    计算逐日简单收益率
+    
+    与 Series.pct_change() 一致：先前向填充缺失值，首日为NaN；
+    收益率直接在连续数组上用 np.diff 计算，避免pandas的对齐和shift开销。
+    
+    参数:
+    close (Series): 收盘价序列
+    
+    返回:
+    Series: 收益率序列
+    """
+    prices = close.ffill().to_numpy(dtype=np.float64)
+    returns = np.empty_like(prices)
+    returns[:1] = np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(np.diff(prices), prices[:-1], out=returns[1:])
+    return pd.Series(returns, index=close.index)
+
 def dynamic_atr_rsi(price_data, rsi_period=14, atr_period=14, lookback_period=252):
     """
     基于ATR的动态RSI算法，使用相对历史波动率来调整RSI阈值
@@ -38,9 +88,10 @@ def dynamic_atr_rsi(price_data, rsi_period=14, atr_period=14, lookback_period=25
     low = price_data['Low']
     close = price_data['Close']
     
+    prev_close = close.shift()
     tr1 = high - low
-    tr2 = abs(high - close.shift())
-    tr3 = abs(low - close.shift())
+    tr2 = abs(high - prev_close)
+    tr3 = abs(low - prev_close)
     tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
     
     atr = tr.rolling(window=atr_period).mean()
@@ -49,9 +100,7 @@ def dynamic_atr_rsi(price_data, rsi_period=14, atr_period=14, lookback_period=25
     atr_pct = (atr / close) * 100
     
     # 计算波动率的历史百分位
-    volatility_percentile = atr_pct.rolling(window=lookback_period).apply(
-        lambda x: pd.Series(x).rank(pct=True).iloc[-1]
-    )
+    volatility_percentile = _rolling_last_percentile(atr_pct, lookback_period)
     
     # 平滑地调整RSI阈值
     base_oversold = 30
@@ -112,10 +161,10 @@ def backtest_dynamic_rsi(price_data, initial_capital=10000):
     results = dynamic_atr_rsi(price_data)
     signals = generate_signals(results)
     
-    # 创建回测结果DataFrame
-    backtest = signals.copy()
+    # 信号表是本函数内部的中间结果，直接在其上追加回测列，不再整表复制
+    backtest = signals
     backtest['position'] = signals['signal'].shift(1).fillna(0).cumsum()
-    backtest['returns'] = price_data['Close'].pct_change()
+    backtest['returns'] = _simple_returns(price_data['Close'])
     backtest['strategy_returns'] = backtest['position'] * backtest['returns']
     
     # 计算累积收益
@@ -10,6 +10,7 @@
 
 import pandas as pd
 import numpy as np
+from scipy.signal import lfilter
 
 
 def calculate_macd(prices: pd.Series) -> tuple:
@@ -68,10 +69,14 @@ def calculate_kdj(high: pd.Series, low: pd.Series, close: pd.Series, n: int = 9)
     k = pd.Series(50.0, index=close.index)
     d = pd.Series(50.0, index=close.index)
     
-    # 计算K、D、J值
-    for i in range(n, len(close)):
-        k.iloc[i] = 2/3 * k.iloc[i-1] + 1/3 * rsv.iloc[i]
-        d.iloc[i] = 2/3 * d.iloc[i-1] + 1/3 * k.iloc[i]
+    # 计算K、D值：K = 2/3*前K + 1/3*RSV，D = 2/3*前D + 1/3*K，
+    # 是一阶递推滤波，用lfilter在C层完成整段递推（初始状态对应前值50）
+    if len(close) > n:
+        initial_state = [2/3 * 50.0]
+        k_values, _ = lfilter([1/3], [1, -2/3], rsv.to_numpy(dtype=np.float64)[n:], zi=initial_state)
+        d_values, _ = lfilter([1/3], [1, -2/3], k_values, zi=initial_state)
+        k.iloc[n:] = k_values
+        d.iloc[n:] = d_values
     
     j = 3 * k - 2 * d
     
@@ -113,9 +118,11 @@ def calculate_rsi(prices: pd.Series, period: int = 14) -> float:
     avg_loss = loss.rolling(window=period).mean().iloc[period-1]
     
     # 使用Wilder平滑方法计算后续值
-    for i in range(period, len(delta)):
-        avg_gain = (avg_gain * (period - 1) + gain.iloc[i]) / period
-        avg_loss = (avg_loss * (period - 1) + loss.iloc[i]) / period
+    # 循环前一次性取出为Python列表，避免每次迭代两次Series.iloc索引
+    for gain_value, loss_value in zip(gain.to_numpy(dtype=np.float64)[period:].tolist(),
+                                      loss.to_numpy(dtype=np.float64)[period:].tolist()):
+        avg_gain = (avg_gain * (period - 1) + gain_value) / period
+        avg_loss = (avg_loss * (period - 1) + loss_value) / period
     
     # 避免除以零
     if avg_loss == 0:
@@ -154,9 +161,10 @@ def calculate_dynamic_rsi_thresholds(high: pd.Series, low: pd.Series, close: pd.
     rsi = calculate_rsi(close, rsi_period)
     
     # 计算ATR
+    prev_close = close.shift()
     tr1 = high - low
-    tr2 = abs(high - close.shift())
-    tr3 = abs(low - close.shift())
+    tr2 = abs(high - prev_close)
+    tr3 = abs(low - prev_close)
     tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
     
     atr = tr.rolling(window=atr_period).mean()
@@ -185,6 +193,41 @@ def calculate_dynamic_rsi_thresholds(high: pd.Series, low: pd.Series, close: pd.
     return float(rsi), float(oversold), float(overbought), float(volatility_percentile)
 
 
+def calculate_moving_averages(prices: pd.Series, windows: tuple = (5, 10, 20, 50, 200)) -> dict:
+    """
+    计算多个周期的简单移动平均线
+    
+    所有周期共用同一个前缀和，一次遍历得到全部均线，不再对每个周期各做一遍滚动计算。
+    与rolling(window).mean()一致：窗口未满或窗口内有缺失值时结果为NaN。
+    非有限值（NaN/±inf）不计入前缀和，按缺失值处理，不会影响不包含它的后续窗口。
+    
+    参数:
+        prices: 价格序列，通常使用收盘价
+        windows: 均线周期元组，默认(5, 10, 20, 50, 200)
+        
+    返回:
+        dict: {周期: 移动平均线序列}
+    """
+    values = prices.to_numpy(dtype=np.float64)
+    n = len(values)
+    # inf留在前缀和里会使之后所有窗口都变成inf-inf=NaN，因此与NaN一样排除
+    missing = ~np.isfinite(values)
+    
+    # 前缀和（缺失值按0累加），另记缺失值个数的前缀和，用于判断窗口内是否有缺失值
+    cumsum = np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, values))))
+    missing_count = np.concatenate(([0], np.cumsum(missing)))
+    
+    averages = {}
+    for window in windows:
+        ma = np.full(n, np.nan)
+        if n >= window:
+            window_sum = cumsum[window:] - cumsum[:-window]
+            complete = (missing_count[window:] - missing_count[:-window]) == 0
+            ma[window - 1:] = np.where(complete, window_sum / window, np.nan)
+        averages[window] = pd.Series(ma, index=prices.index, name=prices.name)
+    
+    return averages
+
 def calculate_bollinger_bands(prices: pd.Series, window: int = 20, num_std: float = 2.0) -> tuple:
     """
     计算布林带指标
@@ -207,21 +250,21 @@ def calculate_bollinger_bands(prices: pd.Series, window: int = 20, num_std: floa
     # 计算标准差
     std = prices.rolling(window=window).std()
     
-    # 计算上下轨
-    upper = middle + (std * num_std)
-    lower = middle - (std * num_std)
-    
-    # 计算带宽 (Bandwidth)
-    bandwidth = (upper - lower) / middle
+    # 只需要最新值：在最后一根K线上计算上下轨，轨道宽度只计算一次
+    latest_middle = middle.iloc[-1]
+    band_offset = std.iloc[-1] * num_std
     
-    # 计算百分比B (%B)
-    percent_b = (prices - lower) / (upper - lower)
+    # 计算上下轨
+    latest_upper = latest_middle + band_offset
+    latest_lower = latest_middle - band_offset
+    band_spread = latest_upper - latest_lower
     
-    # 获取最新值
-    latest_upper = float(upper.iloc[-1])
-    latest_middle = float(middle.iloc[-1])
-    latest_lower = float(lower.iloc[-1])
-    latest_bandwidth = float(bandwidth.iloc[-1])
-    latest_percent_b = float(percent_b.iloc[-1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # 计算带宽 (Bandwidth)
+        latest_bandwidth = band_spread / latest_middle
+        
+        # 计算百分比B (%B)
+        latest_percent_b = (prices.iloc[-1] - latest_lower) / band_spread
     
-    return latest_upper, latest_middle, latest_lower, latest_bandwidth, latest_percent_b 
\ No newline at end of file
+    return (float(latest_upper), float(latest_middle), float(latest_lower),
+            float(latest_bandwidth), float(latest_percent_b)) 
\ No newline at end of file
@@ -6,6 +6,7 @@ TradeMind Lite（轻量版）- 形态识别模块
 
 from dataclasses import dataclass
 from typing import List
+import numpy as np
 import pandas as pd
 
 
@@ -19,11 +20,29 @@ class TechnicalPattern:
         confidence: 置信度（0-100）
         description: 形态描述
     """
+    # 固定字段使用__slots__存储，不再为每个形态实例分配属性字典
+    # （兼容Python 3.8，不使用dataclass的slots参数）
+    __slots__ = ('name', 'confidence', 'description')
+    
     name: str
     confidence: float
     description: str
 
 
+def _nan_mean(values: np.ndarray) -> float:
+    """
+    计算忽略NaN的均值，与pandas的mean()一致；没有有效值时返回NaN（不产生警告）
+    
+    参数:
+        values: 数值数组
+        
+    返回:
+        float: 均值
+    """
+    valid = values[~np.isnan(values)]
+    return valid.mean() if len(valid) else np.nan
+
+
 def identify_candlestick_patterns(data: pd.DataFrame) -> List[TechnicalPattern]:
     """
     识别K线图中的蜡烛图形态。
@@ -39,36 +58,35 @@ def identify_candlestick_patterns(data: pd.DataFrame) -> List[TechnicalPattern]:
     if len(data) < 5:  # 增加到5根K线以获取更多上下文
         return patterns
     
-    # 获取最近的K线数据
-    latest = data.iloc[-1]
-    prev = data.iloc[-2]
-    prev2 = data.iloc[-3]
-    prev3 = data.iloc[-4]
-    prev4 = data.iloc[-5]
-    
-    open_price = latest['Open']
-    close = latest['Close']
-    high = latest['High']
-    low = latest['Low']
+    # 获取最近的K线数据：一次取出尾部OHLC数组，避免逐行构造Series再按标签取值
+    ohlc = data[['Open', 'High', 'Low', 'Close']].iloc[-3:].to_numpy()
+    open_price, high, low, close = ohlc[-1]
+    prev_open, _, _, prev_close = ohlc[-2]
+    prev2_open, _, _, prev2_close = ohlc[-3]
     
     body = abs(open_price - close)
     upper_shadow = high - max(open_price, close)
     lower_shadow = min(open_price, close) - low
     total_length = high - low
     
-    # 计算前几天的平均波动范围作为参考
-    avg_range = (data['High'] - data['Low']).iloc[-5:].mean()
+    # 计算前几天的平均波动范围作为参考（只对最近5根K线做减法）
+    avg_range = _nan_mean(data['High'].to_numpy(dtype=np.float64)[-5:] - data['Low'].to_numpy(dtype=np.float64)[-5:])
+    
+    # 最近5日与之前5日的收盘均价，用于锤子线和吊颈线的趋势确认（之前5日不足5根时按实际根数取均值，与iloc[-10:-5]一致；只有K线不超过5根时之前均价为NaN）
+    close_tail = data['Close'].to_numpy(dtype=np.float64)[-10:]
+    recent_close_mean = _nan_mean(close_tail[-5:])
+    earlier_close_mean = _nan_mean(close_tail[:-5])
     
     # 十字星形态 - 改进判断标准
     if body <= total_length * 0.15 and total_length >= avg_range * 0.8:
         # 增加位置判断，提高准确性
-        if prev['Close'] > prev['Open'] and close < open_price:  # 可能是看跌十字星
+        if prev_close > prev_open and close < open_price:  # 可能是看跌十字星
             patterns.append(TechnicalPattern(
                 name="看跌十字星",
                 confidence=80,
                 description="开盘价和收盘价接近，位于上升趋势之后，可能预示着反转"
             ))
-        elif prev['Close'] < prev['Open'] and close > open_price:  # 可能是看涨十字星
+        elif prev_close < prev_open and close > open_price:  # 可能是看涨十字星
             patterns.append(TechnicalPattern(
                 name="看涨十字星",
                 confidence=80,
@@ -84,7 +102,7 @@ def identify_candlestick_patterns(data: pd.DataFrame) -> List[TechnicalPattern]:
     # 锤子线 - 改进判断标准
     if (lower_shadow > body * 2) and (upper_shadow < body * 0.3) and (body > 0):
         # 增加趋势确认
-        if data['Close'].iloc[-5:].mean() > data['Close'].iloc[-10:-5].mean():
+        if recent_close_mean > earlier_close_mean:
             confidence = 60  # 在上升趋势中出现锤子线，降低置信度
         else:
             confidence = 85  # 在下降趋势中出现锤子线，提高置信度
@@ -98,7 +116,7 @@ def identify_candlestick_patterns(data: pd.DataFrame) -> List[TechnicalPattern]:
     # 吊颈线 - 改进判断标准
     if (upper_shadow > body * 2) and (lower_shadow < body * 0.3) and (body > 0):
         # 增加趋势确认
-        if data['Close'].iloc[-5:].mean() < data['Close'].iloc[-10:-5].mean():
+        if recent_close_mean < earlier_close_mean:
             confidence = 60  # 在下降趋势中出现吊颈线，降低置信度
         else:
             confidence = 85  # 在上升趋势中出现吊颈线，提高置信度
@@ -111,10 +129,10 @@ def identify_candlestick_patterns(data: pd.DataFrame) -> List[TechnicalPattern]:
     
     # 增加启明星形态识别
     if (len(data) >= 5 and 
-        prev2['Close'] < prev2['Open'] and  # 第一天是阴线
-        abs(prev['Close'] - prev['Open']) < abs(prev2['Close'] - prev2['Open']) * 0.5 and  # 第二天是小实体
+        prev2_close < prev2_open and  # 第一天是阴线
+        abs(prev_close - prev_open) < abs(prev2_close - prev2_open) * 0.5 and  # 第二天是小实体
         close > open_price and  # 第三天是阳线
-        close > (prev2['Open'] + prev2['Close']) / 2):  # 第三天收盘价高于第一天实体中点
+        close > (prev2_open + prev2_close) / 2):  # 第三天收盘价高于第一天实体中点
         
         patterns.append(TechnicalPattern(
             name="启明星",
@@ -124,10 +142,10 @@ def identify_candlestick_patterns(data: pd.DataFrame) -> List[TechnicalPattern]:
     
     # 增加黄昏星形态识别
     if (len(data) >= 5 and 
-        prev2['Close'] > prev2['Open'] and  # 第一天是阳线
-        abs(prev['Close'] - prev['Open']) < abs(prev2['Close'] - prev2['Open']) * 0.5 and  # 第二天是小实体
+        prev2_close > prev2_open and  # 第一天是阳线
+        abs(prev_close - prev_open) < abs(prev2_close - prev2_open) * 0.5 and  # 第二天是小实体
         close < open_price and  # 第三天是阴线
-        close < (prev2['Open'] + prev2['Close']) / 2):  # 第三天收盘价低于第一天实体中点
+        close < (prev2_open + prev2_close) / 2):  # 第三天收盘价低于第一天实体中点
         
         patterns.append(TechnicalPattern(
             name="黄昏星",
@@ -136,10 +154,10 @@ def identify_candlestick_patterns(data: pd.DataFrame) -> List[TechnicalPattern]:
         ))
     
     # 增加吞没形态识别
-    if (prev['Close'] < prev['Open'] and  # 前一天是阴线
+    if (prev_close < prev_open and  # 前一天是阴线
         close > open_price and  # 当天是阳线
-        open_price < prev['Close'] and  # 当天开盘价低于前一天收盘价
-        close > prev['Open']):  # 当天收盘价高于前一天开盘价
+        open_price < prev_close and  # 当天开盘价低于前一天收盘价
+        close > prev_open):  # 当天收盘价高于前一天开盘价
         
         patterns.append(TechnicalPattern(
             name="看涨吞没",
@@ -147,10 +165,10 @@ def identify_candlestick_patterns(data: pd.DataFrame) -> List[TechnicalPattern]:
             description="两日反转形态，当天阳线吞没前一天阴线，预示着可能的底部反转"
         ))
     
-    if (prev['Close'] > prev['Open'] and  # 前一天是阳线
+    if (prev_close > prev_open and  # 前一天是阳线
         close < open_price and  # 当天是阴线
-        open_price > prev['Close'] and  # 当天开盘价高于前一天收盘价
-        close < prev['Open']):  # 当天收盘价低于前一天开盘价
+        open_price > prev_close and  # 当天开盘价高于前一天收盘价
+        close < prev_open):  # 当天收盘价低于前一天开盘价
         
         patterns.append(TechnicalPattern(
             name="看跌吞没",
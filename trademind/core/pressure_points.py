@@ -9,6 +9,7 @@ TradeMind - 压力位分析器模块
 
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 from typing import Dict, List, Tuple, Optional
 import logging
 
@@ -114,21 +115,18 @@ class PressurePointAnalyzer:
         else:
             strength = np.zeros_like(hist)
         
-        # 创建价格分布结果
-        distribution = []
-        for i in range(len(bin_centers)):
-            distribution.append({
+        # 在数组上过滤强度高于平均值的价格区域，并按强度降序（强度相同保持价格顺序）排列，
+        # 只为保留下来的区域构建结果字典
+        avg_strength = strength.mean()
+        order = np.argsort(-strength, kind='stable')
+        significant_areas = [
+            {
                 'price': bin_centers[i],
                 'strength': int(strength[i]),
                 'volume': int(hist[i])
-            })
-        
-        # 按强度降序排序
-        distribution.sort(key=lambda x: x['strength'], reverse=True)
-        
-        # 过滤强度高于平均值的价格区域
-        avg_strength = sum(item['strength'] for item in distribution) / len(distribution)
-        significant_areas = [item for item in distribution if item['strength'] > avg_strength]
+            }
+            for i in order if strength[i] > avg_strength
+        ]
         
         return significant_areas
     
@@ -139,12 +137,15 @@ class PressurePointAnalyzer:
         返回:
             Dict: 各周期均线位置
         """
+        closes = self.price_data['Close'].to_numpy(dtype=np.float64)
         current_price = self.price_data['Close'].iloc[-1]
         ma_levels = {}
         
         for period in self.ma_periods:
-            if len(self.price_data) >= period:
-                ma = self.price_data['Close'].rolling(window=period).mean().iloc[-1]
+            if len(closes) >= period:
+                # 只用到最后一个均线值，直接对末尾窗口求均值，无需整列滚动计算；
+                # 窗口内有NaN时结果仍为NaN，与rolling(window).mean()一致
+                ma = float(closes[-period:].mean())
                 ma_name = f'MA{period}'
                 ma_levels[ma_name] = ma
                 
@@ -173,21 +174,20 @@ class PressurePointAnalyzer:
         highs = []
         lows = []
         
-        # 找出局部高点和低点
-        for i in range(lookaround, len(recent_data) - lookaround):
-            # 获取当前位置的高低价
-            current_high = recent_data['High'].iloc[i]
-            current_low = recent_data['Low'].iloc[i]
+        # 找出局部高点和低点：以当前点为中心的窗口极值等于当前值即为摇摆点
+        span = 2 * lookaround + 1
+        if len(recent_data) >= span:
+            high_values = recent_data['High'].to_numpy()
+            low_values = recent_data['Low'].to_numpy()
+            center_highs = high_values[lookaround:len(high_values) - lookaround]
+            center_lows = low_values[lookaround:len(low_values) - lookaround]
             
-            # 检查是否是局部高点
-            if all(current_high >= recent_data['High'].iloc[i-lookaround:i]) and \
-               all(current_high >= recent_data['High'].iloc[i+1:i+lookaround+1]):
-                highs.append((recent_data.index[i], current_high))
+            high_mask = center_highs == sliding_window_view(high_values, span).max(axis=1)
+            low_mask = center_lows == sliding_window_view(low_values, span).min(axis=1)
             
-            # 检查是否是局部低点
-            if all(current_low <= recent_data['Low'].iloc[i-lookaround:i]) and \
-               all(current_low <= recent_data['Low'].iloc[i+1:i+lookaround+1]):
-                lows.append((recent_data.index[i], current_low))
+            dates = recent_data.index[lookaround:len(recent_data) - lookaround]
+            highs = [(dates[i], center_highs[i]) for i in np.flatnonzero(high_mask)]
+            lows = [(dates[i], center_lows[i]) for i in np.flatnonzero(low_mask)]
         
         # 排序并保留最显著的几个点
         highs.sort(key=lambda x: x[1], reverse=True)
@@ -237,38 +237,39 @@ class PressurePointAnalyzer:
         bin_centers = (bin_edges[:-1] + bin_edges[1:]) / 2
         
         # 计算每日价格范围内的成交量分布
-        daily_vol_dist = []
-        
-        for _, row in recent_data.iterrows():
-            # 对每个交易日，计算其成交量在各价格区间的分布
-            price_span = row['High'] - row['Low']
-            if price_span <= 0:
-                continue
-                
-            daily_bins = np.clip(
-                np.searchsorted(bin_edges, [row['Low'], row['High']]), 
-                0, 
-                len(bin_edges) - 1
-            )
-            
-            # 将当天成交量平均分配到价格区间内
-            vol_per_bin = row['Volume'] / (daily_bins[1] - daily_bins[0])
-            
-            for bin_idx in range(daily_bins[0], daily_bins[1]):
-                if bin_idx < len(bin_centers):
-                    daily_vol_dist.append((bin_centers[bin_idx], vol_per_bin))
-        
-        # 按价格分组并汇总成交量
-        price_vol = {}
-        for price, vol in daily_vol_dist:
-            price_bin = np.digitize(price, bin_edges) - 1
-            if 0 <= price_bin < len(bin_centers):
-                bin_price = bin_centers[price_bin]
-                price_vol[bin_price] = price_vol.get(bin_price, 0) + vol
+        # 各列一次性取为NumPy数组按日向量化处理，替代iterrows逐行构造Series
+        lows = recent_data['Low'].to_numpy(dtype=np.float64)
+        highs = recent_data['High'].to_numpy(dtype=np.float64)
+        volumes = recent_data['Volume'].to_numpy(dtype=np.float64)
+        
+        # 跳过价格范围不为正的交易日（NaN范围与原逐行判断一致，不跳过）
+        valid_days = ~(highs - lows <= 0)
+        last_edge = len(bin_edges) - 1
+        start_bins = np.clip(np.searchsorted(bin_edges, lows[valid_days]), 0, last_edge)
+        end_bins = np.clip(np.searchsorted(bin_edges, highs[valid_days]), 0, last_edge)
+        
+        # 将当天成交量平均分配到价格区间内：第d天覆盖[start_bins[d], end_bins[d])，按天、按区间升序展开
+        bin_counts = np.maximum(end_bins - start_bins, 0)
+        offsets = np.arange(bin_counts.sum()) - np.repeat(np.cumsum(bin_counts) - bin_counts, bin_counts)
+        bin_idx = np.repeat(start_bins, bin_counts) + offsets
+        vol_per_bin = np.repeat(volumes[valid_days], bin_counts) / np.repeat(bin_counts, bin_counts)
+        
+        # 按价格分组并汇总成交量（分组顺序按首次出现，组内按展开顺序依次累加）
+        center_bins = np.digitize(bin_centers, bin_edges) - 1
+        price_bins = center_bins[bin_idx]
+        in_range = (price_bins >= 0) & (price_bins < len(bin_centers))
+        bin_prices = bin_centers[price_bins[in_range]]
+        unique_prices, first_seen, group_ids = np.unique(bin_prices, return_index=True, return_inverse=True)
+        group_vols = np.zeros(len(unique_prices))
+        np.add.at(group_vols, group_ids, vol_per_bin[in_range])
+        price_vol = {unique_prices[g]: group_vols[g] for g in np.argsort(first_seen, kind='stable')}
         
         # 计算总成交量
         total_vol = sum(price_vol.values())
         
+        # 当前价格只按位置读取一次，不再在每个聚集区上按列名取列后再定位
+        current_price = self.price_data['Close'].iat[-1] if price_vol else None
+        
         # 找出成交量占比高于阈值的价格区域
         vol_clusters = []
         for price, vol in price_vol.items():
@@ -281,7 +282,6 @@ class PressurePointAnalyzer:
                 })
                 
                 # 添加到支撑/阻力位列表
-                current_price = self.price_data['Close'].iloc[-1]
                 if price <= current_price:
                     self.support_levels.append((price, "成交量聚集区"))
                 else:
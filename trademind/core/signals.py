@@ -5,6 +5,7 @@ TradeMind Lite（轻量版）- 信号生成模块
 """
 
 from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
 import pandas as pd
 import numpy as np
 from .patterns import TechnicalPattern
@@ -43,64 +44,217 @@ def generate_signals(data: pd.DataFrame, indicators: Dict) -> pd.DataFrame:
         return signals
     
     # 提取基本价格数据
+    # 缺失项的默认值直接用标量，由下方DataFrame构造时按close的索引广播成列；
+    # dict.get的默认参数总会先求值，用Series作默认值时即使指标存在也要每项新建一个整列Series
     close = data['Close']
     high = data['High']
     low = data['Low']
-    volume = data.get('Volume', pd.Series(np.nan, index=close.index))
+    volume = data.get('Volume', np.nan)
     
     # 提取技术指标
-    rsi = indicators.get('rsi', pd.Series(np.nan, index=close.index))
+    rsi = indicators.get('rsi', np.nan)
     
     # 提取动态RSI阈值（如果有）
     dynamic_rsi = indicators.get('dynamic_rsi', {})
-    rsi_oversold = dynamic_rsi.get('oversold', pd.Series(30.0, index=close.index))
-    rsi_overbought = dynamic_rsi.get('overbought', pd.Series(70.0, index=close.index))
-    volatility_percentile = dynamic_rsi.get('volatility', pd.Series(0.5, index=close.index))
+    rsi_oversold = dynamic_rsi.get('oversold', 30.0)
+    rsi_overbought = dynamic_rsi.get('overbought', 70.0)
+    volatility_percentile = dynamic_rsi.get('volatility', 0.5)
     
     macd = indicators.get('macd', {})
-    macd_line = macd.get('macd', pd.Series(np.nan, index=close.index))
-    signal_line = macd.get('signal', pd.Series(np.nan, index=close.index))
-    hist = macd.get('hist', pd.Series(np.nan, index=close.index))
+    macd_line = macd.get('macd', np.nan)
+    signal_line = macd.get('signal', np.nan)
+    hist = macd.get('hist', np.nan)
     
     bollinger = indicators.get('bollinger', {})
-    upper_band = bollinger.get('upper', pd.Series(np.nan, index=close.index))
-    middle_band = bollinger.get('middle', pd.Series(np.nan, index=close.index))
-    lower_band = bollinger.get('lower', pd.Series(np.nan, index=close.index))
+    upper_band = bollinger.get('upper', np.nan)
+    middle_band = bollinger.get('middle', np.nan)
+    lower_band = bollinger.get('lower', np.nan)
     
     # 提取移动平均线
-    sma5 = indicators.get('sma5', pd.Series(np.nan, index=close.index))
-    sma10 = indicators.get('sma10', pd.Series(np.nan, index=close.index))
-    sma50 = indicators.get('sma50', pd.Series(np.nan, index=close.index))
-    
-    # 创建信号DataFrame
-    signals = pd.DataFrame(index=close.index)
-    signals['close'] = close
-    signals['high'] = high
-    signals['low'] = low
-    signals['volume'] = volume
-    signals['rsi'] = rsi
-    signals['rsi_oversold'] = rsi_oversold
-    signals['rsi_overbought'] = rsi_overbought
-    signals['volatility_percentile'] = volatility_percentile
-    signals['macd_line'] = macd_line
-    signals['signal_line'] = signal_line
-    signals['macd_hist'] = hist
-    signals['upper_band'] = upper_band
-    signals['lower_band'] = lower_band
-    signals['sma5'] = sma5
-    signals['sma10'] = sma10
-    signals['sma50'] = sma50
-    
-    # 生成买入和卖出信号
-    buy_signals = generate_buy_signals(signals)
-    sell_signals = generate_sell_signals(signals)
-    
-    signals['buy_signal'] = buy_signals
-    signals['sell_signal'] = sell_signals
+    sma5 = indicators.get('sma5', np.nan)
+    sma10 = indicators.get('sma10', np.nan)
+    sma50 = indicators.get('sma50', np.nan)
+    
+    # 创建信号DataFrame：所有列一次性交给构造函数，按close的索引统一对齐，
+    # 避免逐列赋值时每列各做一次对齐并反复扩充内部数据块
+    signals = pd.DataFrame({
+        'close': close,
+        'high': high,
+        'low': low,
+        'volume': volume,
+        'rsi': rsi,
+        'rsi_oversold': rsi_oversold,
+        'rsi_overbought': rsi_overbought,
+        'volatility_percentile': volatility_percentile,
+        'macd_line': macd_line,
+        'signal_line': signal_line,
+        'macd_hist': hist,
+        'upper_band': upper_band,
+        'lower_band': lower_band,
+        'sma5': sma5,
+        'sma10': sma10,
+        'sma50': sma50
+    }, index=close.index)
+    
+    # 生成买入和卖出信号（两侧共用同一份列数组，每列只转换一次）
+    columns = _signal_columns(signals)
+    signals['buy_signal'] = _buy_signal_array(columns, len(signals))
+    signals['sell_signal'] = _sell_signal_array(columns, len(signals))
     
     return signals
 
 
+def _column_array(signals: pd.DataFrame, column: str, default: Optional[float] = None) -> Optional[np.ndarray]:
+    """
+    将信号DataFrame中的列一次性转换为连续的float64数组
+    
+    参数:
+        signals: 包含技术指标的DataFrame
+        column: 列名
+        default: 列不存在时用于填充的默认值，为None时返回None
+        
+    返回:
+        Optional[np.ndarray]: 列数据数组，列不存在且无默认值时返回None
+    """
+    if column in signals.columns:
+        return np.ascontiguousarray(signals[column].to_numpy(dtype=np.float64, na_value=np.nan))
+    if default is None:
+        return None
+    return np.full(len(signals), default, dtype=np.float64)
+
+
+def _cross_above(fast: np.ndarray, slow: np.ndarray) -> np.ndarray:
+    """
+    计算上穿信号：前一根K线fast在slow下方，当前K线fast在slow上方
+    
+    参数:
+        fast: 快线数组
+        slow: 慢线数组
+        
+    返回:
+        np.ndarray: 布尔数组，第一根K线恒为False（与shift(1)语义一致）
+    """
+    crossed = np.zeros(len(fast), dtype=bool)
+    crossed[1:] = (fast[:-1] < slow[:-1]) & (fast[1:] > slow[1:])
+    return crossed
+
+
+def _combine_conditions(conditions: List[np.ndarray], length: int) -> np.ndarray:
+    """
+    将多个布尔条件数组按"任一满足"合并为0/1信号数组
+    
+    参数:
+        conditions: 布尔条件数组列表（结构化数组布局，每个条件一列）
+        length: 信号长度
+        
+    返回:
+        np.ndarray: int64类型的0/1信号数组
+    """
+    if not conditions:
+        return np.zeros(length, dtype=np.int64)
+    return np.logical_or.reduce(conditions).astype(np.int64)
+
+
+def _signal_columns(signals: pd.DataFrame) -> Dict[str, Optional[np.ndarray]]:
+    """
+    一次性取出买入和卖出信号用到的全部指标列
+    
+    参数:
+        signals: 包含技术指标的DataFrame
+        
+    返回:
+        Dict[str, Optional[np.ndarray]]: 列名到float64数组的映射，不存在的列为None（RSI阈值列使用默认值填充）
+    """
+    columns = {
+        column: _column_array(signals, column)
+        for column in ('close', 'rsi', 'macd_line', 'signal_line', 'upper_band', 'lower_band', 'sma5', 'sma10')
+    }
+    # 使用动态RSI阈值（如果存在）或默认值
+    columns['rsi_oversold'] = _column_array(signals, 'rsi_oversold', 30.0)
+    columns['rsi_overbought'] = _column_array(signals, 'rsi_overbought', 70.0)
+    return columns
+
+
+def _buy_signal_array(columns: Dict[str, Optional[np.ndarray]], length: int) -> np.ndarray:
+    """
+    根据指标列数组计算买入信号
+    
+    参数:
+        columns: _signal_columns返回的列数组
+        length: 信号长度
+        
+    返回:
+        np.ndarray: int64类型的0/1买入信号数组
+    """
+    close = columns['close']
+    rsi = columns['rsi']
+    macd_line = columns['macd_line']
+    signal_line = columns['signal_line']
+    lower_band = columns['lower_band']
+    sma5 = columns['sma5']
+    sma10 = columns['sma10']
+    
+    conditions = []
+    
+    # RSI超卖信号
+    if rsi is not None:
+        conditions.append(rsi < columns['rsi_oversold'])
+    
+    # MACD金叉信号：前一天MACD线在信号线下方，今天MACD线在信号线上方
+    if macd_line is not None and signal_line is not None:
+        conditions.append(_cross_above(macd_line, signal_line))
+    
+    # 价格突破布林带下轨信号：前一天收盘价在下轨下方，今天收盘价在下轨上方
+    if close is not None and lower_band is not None:
+        conditions.append(_cross_above(close, lower_band))
+    
+    # 短期均线上穿长期均线信号：前一天5日均线在10日均线下方，今天5日均线在10日均线上方
+    if sma5 is not None and sma10 is not None:
+        conditions.append(_cross_above(sma5, sma10))
+    
+    return _combine_conditions(conditions, length)
+
+
+def _sell_signal_array(columns: Dict[str, Optional[np.ndarray]], length: int) -> np.ndarray:
+    """
+    根据指标列数组计算卖出信号
+    
+    参数:
+        columns: _signal_columns返回的列数组
+        length: 信号长度
+        
+    返回:
+        np.ndarray: int64类型的0/1卖出信号数组
+    """
+    close = columns['close']
+    rsi = columns['rsi']
+    macd_line = columns['macd_line']
+    signal_line = columns['signal_line']
+    upper_band = columns['upper_band']
+    sma5 = columns['sma5']
+    sma10 = columns['sma10']
+    
+    conditions = []
+    
+    # RSI超买信号
+    if rsi is not None:
+        conditions.append(rsi > columns['rsi_overbought'])
+    
+    # MACD死叉信号：前一天MACD线在信号线上方，今天MACD线在信号线下方
+    if macd_line is not None and signal_line is not None:
+        conditions.append(_cross_above(signal_line, macd_line))
+    
+    # 价格跌回布林带上轨信号：前一天收盘价在上轨上方，今天收盘价在上轨下方
+    if close is not None and upper_band is not None:
+        conditions.append(_cross_above(upper_band, close))
+    
+    # 短期均线下穿长期均线信号：前一天5日均线在10日均线上方，今天5日均线在10日均线下方
+    if sma5 is not None and sma10 is not None:
+        conditions.append(_cross_above(sma10, sma5))
+    
+    return _combine_conditions(conditions, length)
+
+
 def generate_buy_signals(signals: pd.DataFrame) -> pd.Series:
     """
     生成买入信号
@@ -111,47 +265,11 @@ def generate_buy_signals(signals: pd.DataFrame) -> pd.Series:
     返回:
         pd.Series: 买入信号序列，1表示买入，0表示不操作
     """
-    buy_signals = pd.Series(0, index=signals.index)
-    
     # 检查是否有足够的数据
     if len(signals) < 2:
-        return buy_signals
-    
-    # 使用动态RSI阈值（如果存在）或默认值
-    if 'rsi_oversold' in signals.columns:
-        rsi_oversold = signals['rsi_oversold']
-    else:
-        rsi_oversold = pd.Series(30.0, index=signals.index)
+        return pd.Series(0, index=signals.index)
     
-    # RSI超卖信号
-    if 'rsi' in signals.columns:
-        buy_signals.loc[signals['rsi'] < rsi_oversold] = 1
-    
-    # MACD金叉信号
-    if 'macd_line' in signals.columns and 'signal_line' in signals.columns:
-        # 前一天MACD线在信号线下方，今天MACD线在信号线上方
-        prev_below = signals['macd_line'].shift(1) < signals['signal_line'].shift(1)
-        curr_above = signals['macd_line'] > signals['signal_line']
-        macd_golden_cross = prev_below & curr_above
-        buy_signals.loc[macd_golden_cross] = 1
-    
-    # 价格突破布林带下轨信号
-    if 'close' in signals.columns and 'lower_band' in signals.columns:
-        # 前一天收盘价在下轨下方，今天收盘价在下轨上方
-        prev_below = signals['close'].shift(1) < signals['lower_band'].shift(1)
-        curr_above = signals['close'] > signals['lower_band']
-        bb_bounce = prev_below & curr_above
-        buy_signals.loc[bb_bounce] = 1
-    
-    # 短期均线上穿长期均线信号
-    if 'sma5' in signals.columns and 'sma10' in signals.columns:
-        # 前一天5日均线在10日均线下方，今天5日均线在10日均线上方
-        prev_below = signals['sma5'].shift(1) < signals['sma10'].shift(1)
-        curr_above = signals['sma5'] > signals['sma10']
-        ma_golden_cross = prev_below & curr_above
-        buy_signals.loc[ma_golden_cross] = 1
-    
-    return buy_signals
+    return pd.Series(_buy_signal_array(_signal_columns(signals), len(signals)), index=signals.index)
 
 
 def generate_sell_signals(signals: pd.DataFrame) -> pd.Series:
@@ -164,163 +282,225 @@ def generate_sell_signals(signals: pd.DataFrame) -> pd.Series:
     返回:
         pd.Series: 卖出信号序列，1表示卖出，0表示不操作
     """
-    sell_signals = pd.Series(0, index=signals.index)
-    
     # 检查是否有足够的数据
     if len(signals) < 2:
-        return sell_signals
+        return pd.Series(0, index=signals.index)
     
-    # 使用动态RSI阈值（如果存在）或默认值
-    if 'rsi_overbought' in signals.columns:
-        rsi_overbought = signals['rsi_overbought']
-    else:
-        rsi_overbought = pd.Series(70.0, index=signals.index)
-    
-    # RSI超买信号
-    if 'rsi' in signals.columns:
-        sell_signals.loc[signals['rsi'] > rsi_overbought] = 1
-    
-    # MACD死叉信号
-    if 'macd_line' in signals.columns and 'signal_line' in signals.columns:
-        # 前一天MACD线在信号线上方，今天MACD线在信号线下方
-        prev_above = signals['macd_line'].shift(1) > signals['signal_line'].shift(1)
-        curr_below = signals['macd_line'] < signals['signal_line']
-        macd_death_cross = prev_above & curr_below
-        sell_signals.loc[macd_death_cross] = 1
-    
-    # 价格突破布林带上轨信号
-    if 'close' in signals.columns and 'upper_band' in signals.columns:
-        # 前一天收盘价在上轨上方，今天收盘价在上轨下方
-        prev_above = signals['close'].shift(1) > signals['upper_band'].shift(1)
-        curr_below = signals['close'] < signals['upper_band']
-        bb_reversal = prev_above & curr_below
-        sell_signals.loc[bb_reversal] = 1
-    
-    # 短期均线下穿长期均线信号
-    if 'sma5' in signals.columns and 'sma10' in signals.columns:
-        # 前一天5日均线在10日均线上方，今天5日均线在10日均线下方
-        prev_above = signals['sma5'].shift(1) > signals['sma10'].shift(1)
-        curr_below = signals['sma5'] < signals['sma10']
-        ma_death_cross = prev_above & curr_below
-        sell_signals.loc[ma_death_cross] = 1
-    
-    return sell_signals
+    return pd.Series(_sell_signal_array(_signal_columns(signals), len(signals)), index=signals.index)
 
 
-def generate_trading_advice(indicators: Dict, current_price: float, 
-                           patterns: Optional[List[TechnicalPattern]] = None) -> Dict:
+@lru_cache(maxsize=4096)
+def _score_indicator_states(macd_zone: int, macd_cross: int, rsi_band: int,
+                            kdj_state: Optional[Tuple[int, int]],
+                            bb_state: Optional[Tuple[int, int]]) -> Tuple[Tuple[float, float, float], Tuple[str, ...]]:
     """
-    基于行业标准量化模型生成交易建议
+    根据量化后的指标状态计算三个评分系统的得分和对应信号
     
     参数:
-        indicators: 技术指标字典
-        current_price: 当前价格
-        patterns: K线形态列表
+        macd_zone: MACD双线所在区域，1为零轴以上，-1为零轴以下，0为其他
+        macd_cross: MACD交叉状态，1为金叉，-1为死叉，0为无
+        rsi_band: RSI区间，2超卖，1偏弱，-2超买，-1偏强，0中性
+        kdj_state: (超买超卖状态, 交叉状态)，没有KDJ数据时为None
+        bb_state: (价格相对布林带位置, 带宽区间)，没有布林带数据时为None
         
     返回:
-        Dict: 包含建议、置信度、信号和颜色的字典
+        Tuple: ((趋势得分, 动量得分, 波动得分), 信号元组)
     """
     signals = []
-    
-    # 使用行业标准的量化交易模型:
-    # 1. 趋势确认系统 - 基于Dow理论和Charles Dow的趋势确认方法
-    # 2. 动量反转系统 - 基于Wilder的RSI和Lane的随机指标
-    # 3. 价格波动系统 - 基于Bollinger的布林带和Donchian通道
-    
-    system_scores = {
-        'trend': 0,      # 趋势确认系统得分 (-100 到 100)
-        'momentum': 0,   # 动量反转系统得分 (-100 到 100)
-        'volatility': 0  # 价格波动系统得分 (-100 到 100)
-    }
+    trend = 0
+    momentum = 0
+    volatility = 0
     
     # =============== 1. 趋势确认系统 ===============
     # 基于Dow理论、移动平均线交叉和MACD
     
-    # MACD分析 (Gerald Appel的原始MACD设计)
-    macd = indicators.get('macd', {})
-    if not macd:
-        macd = {'macd': 0, 'signal': 0, 'hist': 0}
-    
-    macd_line = macd.get('macd', 0)
-    signal_line = macd.get('signal', 0)
-    hist = macd.get('hist', 0)
-    
     # MACD趋势分析
-    if macd_line > 0 and signal_line > 0:
+    if macd_zone == 1:
         # 双线在零轴上方 - Appel的强势上涨信号
-        system_scores['trend'] += 40
+        trend += 40
         signals.append("MACD零轴以上")
-    elif macd_line < 0 and signal_line < 0:
+    elif macd_zone == -1:
         # 双线在零轴下方 - Appel的强势下跌信号
-        system_scores['trend'] -= 40
+        trend -= 40
         signals.append("MACD零轴以下")
     
     # MACD交叉分析
-    if macd_line > signal_line and macd_line - signal_line > abs(signal_line) * 0.05:
+    if macd_cross == 1:
         # 金叉信号 - 上涨趋势确认
-        system_scores['trend'] += 30
+        trend += 30
         signals.append("MACD金叉")
-    elif macd_line < signal_line and signal_line - macd_line > abs(signal_line) * 0.05:
+    elif macd_cross == -1:
         # 死叉信号 - 下跌趋势确认
-        system_scores['trend'] -= 30
+        trend -= 30
         signals.append("MACD死叉")
     
     # =============== 2. 动量反转系统 ===============
     # 基于RSI和随机指标
     
-    # RSI分析 (Wilder的相对强弱指标)
-    rsi = indicators.get('rsi', 50)  # 默认为中性值50
-    
     # RSI超买超卖分析
-    if rsi < 30:
+    if rsi_band == 2:
         # 超卖区域 - Wilder的买入信号
-        system_scores['momentum'] += 50
+        momentum += 50
         signals.append("RSI超卖")
-    elif rsi < 40:
+    elif rsi_band == 1:
         # 接近超卖区域
-        system_scores['momentum'] += 25
+        momentum += 25
         signals.append("RSI偏弱")
-    elif rsi > 70:
+    elif rsi_band == -2:
         # 超买区域 - Wilder的卖出信号
-        system_scores['momentum'] -= 50
+        momentum -= 50
         signals.append("RSI超买")
-    elif rsi > 60:
+    elif rsi_band == -1:
         # 接近超买区域
-        system_scores['momentum'] -= 25
+        momentum -= 25
         signals.append("RSI偏强")
     
     # KDJ随机指标分析 (Lane的随机指标)
-    kdj = indicators.get('kdj', {})
-    if kdj:
-        k = kdj.get('k', 50)
-        d = kdj.get('d', 50)
-        j = kdj.get('j', 50)
+    if kdj_state is not None:
+        kdj_zone, kdj_cross = kdj_state
         
         # KDJ超买超卖分析
-        if k < 20 and d < 20:
+        if kdj_zone == 1:
             # 超卖区域 - Lane的买入信号
-            system_scores['momentum'] += 40
+            momentum += 40
             signals.append("KDJ超卖")
-        elif k > 80 and d > 80:
+        elif kdj_zone == -1:
             # 超买区域 - Lane的卖出信号
-            system_scores['momentum'] -= 40
+            momentum -= 40
             signals.append("KDJ超买")
         
         # KDJ金叉死叉分析
-        if k > d and k - d > 2:
+        if kdj_cross == 1:
             # 金叉信号 - 上涨动能确认
-            system_scores['momentum'] += 30
+            momentum += 30
             signals.append("KDJ金叉")
-        elif k < d and d - k > 2:
+        elif kdj_cross == -1:
             # 死叉信号 - 下跌动能确认
-            system_scores['momentum'] -= 30
+            momentum -= 30
             signals.append("KDJ死叉")
     
     # =============== 3. 价格波动系统 ===============
     # 基于布林带和Donchian通道
     
-    # 布林带分析 (Bollinger的波动带)
+    if bb_state is not None:
+        bb_position, bb_width_band = bb_state
+        
+        # 价格相对于布林带位置 (Bollinger的%B指标)
+        if bb_position == 2:
+            # 价格低于下轨 - Bollinger的超卖信号
+            volatility += 50
+            signals.append("突破布林下轨")
+        elif bb_position == -2:
+            # 价格高于上轨 - Bollinger的超买信号
+            volatility -= 50
+            signals.append("突破布林上轨")
+        elif bb_position == 1:
+            # 接近下轨 - 轻微超卖
+            volatility += 20
+            signals.append("接近布林下轨")
+        elif bb_position == -1:
+            # 接近上轨 - 轻微超买
+            volatility -= 20
+            signals.append("接近布林上轨")
+        
+        # 布林带宽度分析 (Bollinger的波动性理论)
+        if bb_width_band == -1:  # 带宽较窄
+            signals.append("布林带收窄(可能突破)")
+            # 不直接调整分数，因为方向不确定
+        elif bb_width_band == 1:  # 带宽较宽
+            signals.append("布林带扩张(趋势确认)")
+            # 增强现有趋势信号
+            if trend > 20:
+                trend *= 1.2
+            elif trend < -20:
+                trend *= 1.2
+    
+    return (trend, momentum, volatility), tuple(signals)
+
+
+def generate_trading_advice(indicators: Dict, current_price: float, 
+                           patterns: Optional[List[TechnicalPattern]] = None) -> Dict:
+    """
+    基于行业标准量化模型生成交易建议
+    
+    参数:
+        indicators: 技术指标字典
+        current_price: 当前价格
+        patterns: K线形态列表
+        
+    返回:
+        Dict: 包含建议、置信度、信号和颜色的字典
+    """
+    # 使用行业标准的量化交易模型:
+    # 1. 趋势确认系统 - 基于Dow理论和Charles Dow的趋势确认方法
+    # 2. 动量反转系统 - 基于Wilder的RSI和Lane的随机指标
+    # 3. 价格波动系统 - 基于Bollinger的布林带和Donchian通道
+    #
+    # 各指标先按评分阈值量化为离散状态，状态组合对应的得分和信号由缓存的
+    # _score_indicator_states给出，多只股票落在同一组合时不再重复走判断分支
+    
+    # MACD状态 (Gerald Appel的原始MACD设计)
+    macd = indicators.get('macd', {})
+    if not macd:
+        macd = {'macd': 0, 'signal': 0, 'hist': 0}
+    
+    macd_line = macd.get('macd', 0)
+    signal_line = macd.get('signal', 0)
+    
+    if macd_line > 0 and signal_line > 0:
+        macd_zone = 1
+    elif macd_line < 0 and signal_line < 0:
+        macd_zone = -1
+    else:
+        macd_zone = 0
+    
+    if macd_line > signal_line and macd_line - signal_line > abs(signal_line) * 0.05:
+        macd_cross = 1
+    elif macd_line < signal_line and signal_line - macd_line > abs(signal_line) * 0.05:
+        macd_cross = -1
+    else:
+        macd_cross = 0
+    
+    # RSI状态 (Wilder的相对强弱指标)
+    rsi = indicators.get('rsi', 50)  # 默认为中性值50
+    
+    if rsi < 30:
+        rsi_band = 2
+    elif rsi < 40:
+        rsi_band = 1
+    elif rsi > 70:
+        rsi_band = -2
+    elif rsi > 60:
+        rsi_band = -1
+    else:
+        rsi_band = 0
+    
+    # KDJ状态 (Lane的随机指标)，没有KDJ数据时为None
+    kdj = indicators.get('kdj', {})
+    kdj_state = None
+    if kdj:
+        k = kdj.get('k', 50)
+        d = kdj.get('d', 50)
+        
+        if k < 20 and d < 20:
+            kdj_zone = 1
+        elif k > 80 and d > 80:
+            kdj_zone = -1
+        else:
+            kdj_zone = 0
+        
+        if k > d and k - d > 2:
+            kdj_cross = 1
+        elif k < d and d - k > 2:
+            kdj_cross = -1
+        else:
+            kdj_cross = 0
+        
+        kdj_state = (kdj_zone, kdj_cross)
+    
+    # 布林带状态 (Bollinger的波动带)，没有布林带数据时为None
     bollinger = indicators.get('bollinger', {})
+    bb_state = None
     if bollinger:
         bb_upper = bollinger.get('upper', current_price * 1.1)
         bb_middle = bollinger.get('middle', current_price)
@@ -339,38 +519,35 @@ def generate_trading_advice(indicators: Dict, current_price: float,
         else:
             bb_width = 0.1
         
-        # 价格相对于布林带位置 (Bollinger的%B指标)
         if current_price < bb_lower:
-            # 价格低于下轨 - Bollinger的超卖信号
-            system_scores['volatility'] += 50
-            signals.append("突破布林下轨")
+            bb_position = 2
         elif current_price > bb_upper:
-            # 价格高于上轨 - Bollinger的超买信号
-            system_scores['volatility'] -= 50
-            signals.append("突破布林上轨")
-        elif bb_percent is not None:
-            # 使用%B指标进行更精细的分析
-            if bb_percent < 0.2:
-                # 接近下轨 - 轻微超卖
-                system_scores['volatility'] += 20
-                signals.append("接近布林下轨")
-            elif bb_percent > 0.8:
-                # 接近上轨 - 轻微超买
-                system_scores['volatility'] -= 20
-                signals.append("接近布林上轨")
-            
-        # 布林带宽度分析 (Bollinger的波动性理论)
-        if bb_width is not None:
-            if bb_width < 0.1:  # 带宽较窄
-                signals.append("布林带收窄(可能突破)")
-                # 不直接调整分数，因为方向不确定
-            elif bb_width > 0.3:  # 带宽较宽
-                signals.append("布林带扩张(趋势确认)")
-                # 增强现有趋势信号
-                if system_scores['trend'] > 20:
-                    system_scores['trend'] *= 1.2
-                elif system_scores['trend'] < -20:
-                    system_scores['trend'] *= 1.2
+            bb_position = -2
+        elif bb_percent < 0.2:
+            bb_position = 1
+        elif bb_percent > 0.8:
+            bb_position = -1
+        else:
+            bb_position = 0
+        
+        if bb_width < 0.1:
+            bb_width_band = -1
+        elif bb_width > 0.3:
+            bb_width_band = 1
+        else:
+            bb_width_band = 0
+        
+        bb_state = (bb_position, bb_width_band)
+    
+    (trend_score, momentum_score, volatility_score), base_signals = _score_indicator_states(
+        macd_zone, macd_cross, rsi_band, kdj_state, bb_state
+    )
+    signals = list(base_signals)
+    system_scores = {
+        'trend': trend_score,            # 趋势确认系统得分 (-100 到 100)
+        'momentum': momentum_score,      # 动量反转系统得分 (-100 到 100)
+        'volatility': volatility_score   # 价格波动系统得分 (-100 到 100)
+    }
     
     # =============== 4. 形态分析系统 ===============
     # 基于K线形态识别
@@ -9,28 +9,127 @@ TradeMind - 趋势分析模块
 
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 from typing import Dict, List, Tuple
 import logging
 from scipy import stats
+from scipy.signal import lfilter
 
 logger = logging.getLogger(__name__)
 
+
+def _recursive_smooth(initial: np.ndarray, raw: np.ndarray, start: int, smoothing: float) -> np.ndarray:
+    """
+    对多条序列同时应用递推平滑 s[i] = s[i-1] * (1 - smoothing) + x[i] * smoothing
+    
+    递推从start位置开始，之前的值保持initial不变；整段递推由lfilter在C层一次完成，
+    乘加顺序与逐元素循环一致。
+    
+    参数:
+        initial: 平滑序列初始值，形状为 (序列数, 长度)
+        raw: 原始序列，形状与initial相同
+        start: 开始递推的位置
+        smoothing: 平滑系数
+        
+    返回:
+        np.ndarray: 平滑后的序列
+    """
+    smoothed = np.array(initial, dtype=np.float64)
+    if smoothed.shape[1] > start:
+        decay = 1 - smoothing
+        smoothed[:, start:], _ = lfilter(
+            [smoothing], [1, -decay], raw[:, start:], axis=1,
+            zi=smoothed[:, start - 1:start] * decay
+        )
+    return smoothed
+
+
+def _trend_strength_score(adx_value: float, primary_trend: str, secondary_trend: str,
+                          volume_confirms: bool, support_strength: float,
+                          resistance_strength: float) -> int:
+    """
+    根据ADX、道氏理论和趋势线强度计算趋势强度（0-100）
+    
+    参数:
+        adx_value: ADX值
+        primary_trend: 主要趋势（up/down/neutral）
+        secondary_trend: 次要趋势（up/down/neutral）
+        volume_confirms: 成交量是否确认趋势
+        support_strength: 支撑趋势线强度
+        resistance_strength: 阻力趋势线强度
+        
+    返回:
+        int: 趋势强度值
+    """
+    # 基础分数来自ADX（0-45分）
+    adx_score = min(45, adx_value / 100 * 45)
+    
+    # 趋势一致性分数（0-25分）
+    consistency_score = 0
+    if primary_trend == secondary_trend:
+        consistency_score += 15
+    if volume_confirms:
+        consistency_score += 10
+        
+    # 趋势线强度分数（0-30分）
+    trendline_score = 0
+    if primary_trend == 'up' and support_strength > 0:
+        trendline_score += min(30, support_strength / 3)
+    elif primary_trend == 'down' and resistance_strength > 0:
+        trendline_score += min(30, resistance_strength / 3)
+    
+    # 总分
+    total_score = int(adx_score + consistency_score + trendline_score)
+    
+    return max(0, min(100, total_score))  # 确保范围在0-100之间
+
 class TrendAnalyzer:
-    def __init__(self, price_data: pd.DataFrame):
+    def __init__(self, price_data: pd.DataFrame, symbol: str = ''):
         """
         初始化趋势分析器
         
         参数:
             price_data: 包含OHLCV数据的DataFrame
+            symbol: 股票代码，仅用于日志前缀（多只股票并发分析时区分日志来源）
         """
         self.price_data = price_data
+        self._log_prefix = f"[{symbol}] " if symbol else ""
         self.adx_period = 14
         self.trend_threshold = 20  # ADX趋势强度阈值
+        # 分析结果缓存：analyze()与calculate_trend_strength()共用同一份ADX/道氏/趋势线结果
+        self._result_cache = {}
+        
+    def _cached(self, key: Tuple, compute) -> Dict:
+        """
+        按数据指纹缓存分析结果，同一份数据只计算一次
+        
+        参数:
+            key: 分析项及其参数组成的键
+            compute: 未命中缓存时调用的计算函数
+            
+        返回:
+            Dict: 分析结果
+        """
+        data = self.price_data
+        fingerprint = (id(data), len(data), data.index[-1] if len(data) else None)
+        cache_key = key + fingerprint
+        if cache_key not in self._result_cache:
+            self._result_cache[cache_key] = compute()
+        return self._result_cache[cache_key]
         
     def calculate_adx(self) -> Dict:
         """
         计算ADX及方向指标
         
+        返回:
+            Dict: 包含ADX, +DI, -DI的字典
+        """
+        return self._cached(('adx', self.adx_period), self._calculate_adx)
+    
+    def _calculate_adx(self) -> Dict:
+        """
+        计算ADX及方向指标（未缓存）
+        
         返回:
             Dict: 包含ADX, +DI, -DI的字典
         """
@@ -40,18 +139,18 @@ class TrendAnalyzer:
         
         # 添加数据检查和调试信息
         data_length = len(close)
-        print(f"ADX计算 - 数据长度: {data_length}, 需要至少: {self.adx_period + 1} 个数据点")
+        logger.debug(f"{self._log_prefix}ADX计算 - 数据长度: {data_length}, 需要至少: {self.adx_period + 1} 个数据点")
         
         # 如果数据量不足，尝试减少ADX周期
         original_period = self.adx_period
         if data_length < self.adx_period + 1:
             # 动态调整ADX周期，确保有足够数据计算
             self.adx_period = max(5, data_length - 5)  # 至少需要5个数据点，并且留出5个点计算
-            print(f"数据不足，调整ADX周期从 {original_period} 到 {self.adx_period}")
+            logger.debug(f"{self._log_prefix}数据不足，调整ADX周期从 {original_period} 到 {self.adx_period}")
         
         # 如果数据量仍然不足，返回默认值但添加警告
         if data_length < 10:  # 实际上需要至少10个数据点才能有意义
-            print(f"警告: 数据量({data_length})太少，无法进行有效的ADX计算")
+            logger.debug(f"{self._log_prefix}数据量({data_length})太少，无法进行有效的ADX计算")
             return {'adx': 15.0, 'plus_di': 10.0, 'minus_di': 10.0}  # 返回默认值而不是零值
         
         try:
@@ -61,35 +160,30 @@ class TrendAnalyzer:
                 high = high.fillna(method='ffill').fillna(method='bfill')
                 low = low.fillna(method='ffill').fillna(method='bfill')
                 close = close.fillna(method='ffill').fillna(method='bfill')
-                print("警告: 数据中存在NaN值，已进行填充")
+                logger.debug(f"{self._log_prefix}数据中存在NaN值，已进行填充")
             
             # 计算真实范围TR (使用绝对值避免负数)
+            prev_close = close.shift(1)
             tr1 = (high - low).abs()
-            tr2 = (high - close.shift(1)).abs()
-            tr3 = (low - close.shift(1)).abs()
+            tr2 = (high - prev_close).abs()
+            tr3 = (low - prev_close).abs()
             tr = pd.DataFrame({'tr1': tr1, 'tr2': tr2, 'tr3': tr3}).max(axis=1)
             
             # 计算方向移动 (改进计算逻辑)
-            plus_dm = pd.Series(0.0, index=high.index)
-            minus_dm = pd.Series(0.0, index=high.index)
-            
             # 计算高点和低点的变化
-            high_diff = high.diff()
-            low_diff = low.diff()
+            high_diff = high.diff().to_numpy()
+            low_diff = low.diff().to_numpy()
+            abs_high_diff = np.abs(high_diff)
+            abs_low_diff = np.abs(low_diff)
             
-            # 使用向量化操作计算+DM和-DM
-            for i in range(1, len(high)):
-                # 当前高点高于前一个高点，当前低点高于前一个低点
-                if high_diff.iloc[i] > 0 and high_diff.iloc[i] > abs(low_diff.iloc[i]):
-                    plus_dm.iloc[i] = high_diff.iloc[i]
-                else:
-                    plus_dm.iloc[i] = 0.0
-                
-                # 当前低点低于前一个低点，当前高点低于前一个高点
-                if low_diff.iloc[i] < 0 and abs(low_diff.iloc[i]) > abs(high_diff.iloc[i]):
-                    minus_dm.iloc[i] = abs(low_diff.iloc[i])
-                else:
-                    minus_dm.iloc[i] = 0.0
+            # 对全部历史一次性生成+DM和-DM的条件掩码（NaN比较为False，首根K线为0）
+            # 当前高点高于前一个高点，且涨幅大于低点跌幅
+            plus_mask = (high_diff > 0) & (high_diff > abs_low_diff)
+            # 当前低点低于前一个低点，且跌幅大于高点涨幅
+            minus_mask = (low_diff < 0) & (abs_low_diff > abs_high_diff)
+            
+            plus_dm = pd.Series(np.where(plus_mask, high_diff, 0.0), index=high.index)
+            minus_dm = pd.Series(np.where(minus_mask, abs_low_diff, 0.0), index=high.index)
             
             # 使用指数平滑而不是简单移动平均
             smoothing = 2.0 / (self.adx_period + 1)
@@ -99,11 +193,15 @@ class TrendAnalyzer:
             plus_dm_smoothed = plus_dm.rolling(window=self.adx_period).mean().fillna(plus_dm.mean())
             minus_dm_smoothed = minus_dm.rolling(window=self.adx_period).mean().fillna(minus_dm.mean())
             
-            # 应用威尔德平滑方法
-            for i in range(self.adx_period, len(tr)):
-                tr_smoothed.iloc[i] = tr_smoothed.iloc[i-1] * (1 - smoothing) + tr.iloc[i] * smoothing
-                plus_dm_smoothed.iloc[i] = plus_dm_smoothed.iloc[i-1] * (1 - smoothing) + plus_dm.iloc[i] * smoothing
-                minus_dm_smoothed.iloc[i] = minus_dm_smoothed.iloc[i-1] * (1 - smoothing) + minus_dm.iloc[i] * smoothing
+            # 应用威尔德平滑方法：TR、+DM、-DM三条序列合并为一次递推计算
+            smoothed = _recursive_smooth(
+                np.vstack([tr_smoothed.to_numpy(), plus_dm_smoothed.to_numpy(), minus_dm_smoothed.to_numpy()]),
+                np.vstack([tr.to_numpy(), plus_dm.to_numpy(), minus_dm.to_numpy()]),
+                self.adx_period, smoothing
+            )
+            tr_smoothed = pd.Series(smoothed[0], index=tr.index)
+            plus_dm_smoothed = pd.Series(smoothed[1], index=tr.index)
+            minus_dm_smoothed = pd.Series(smoothed[2], index=tr.index)
             
             # 确保不除以零
             tr_smoothed = tr_smoothed.replace(0, 0.001)
@@ -124,15 +222,18 @@ class TrendAnalyzer:
             
             # 检查DX是否包含有效值
             if dx.isna().all():
-                print("警告: DX计算结果全为NaN")
+                logger.debug(f"{self._log_prefix}DX计算结果全为NaN")
                 return {'adx': 15.0, 'plus_di': 10.0, 'minus_di': 10.0}  # 返回默认值
             
             # 计算ADX - ADX是DX的平滑移动平均
             adx = dx.rolling(window=self.adx_period).mean().fillna(method='bfill')
             
             # 应用平滑
-            for i in range(self.adx_period * 2, len(dx)):
-                adx.iloc[i] = adx.iloc[i-1] * (1 - smoothing) + dx.iloc[i] * smoothing
+            adx = pd.Series(
+                _recursive_smooth(adx.to_numpy()[np.newaxis], dx.to_numpy()[np.newaxis],
+                                  self.adx_period * 2, smoothing)[0],
+                index=dx.index
+            )
             
             # 获取最新值
             adx_value = adx.iloc[-1] if not pd.isna(adx.iloc[-1]) else 15.0
@@ -157,11 +258,11 @@ class TrendAnalyzer:
                 'minus_di': minus_di_value
             }
             
-            print(f"计算ADX结果(详细): {result}")
+            logger.debug(f"{self._log_prefix}计算ADX结果(详细): {result}")
             return result
             
         except Exception as e:
-            print(f"ADX计算出错: {str(e)}")
+            logger.warning(f"{self._log_prefix}ADX计算出错: {str(e)}")
             # 返回默认值而不是零值
             return {'adx': 15.0, 'plus_di': 10.0, 'minus_di': 10.0}
     
@@ -169,6 +270,20 @@ class TrendAnalyzer:
         """
         识别主要趋势线
         
+        参数:
+            window: 分析窗口大小
+            min_points: 确定趋势线所需的最小点数
+            
+        返回:
+            Dict: 包含支撑和阻力趋势线参数
+        """
+        return self._cached(('trend_lines', window, min_points),
+                            lambda: self._identify_trend_lines(window, min_points))
+    
+    def _identify_trend_lines(self, window: int, min_points: int) -> Dict:
+        """
+        识别主要趋势线（未缓存）
+        
         参数:
             window: 分析窗口大小
             min_points: 确定趋势线所需的最小点数
@@ -192,25 +307,20 @@ class TrendAnalyzer:
         # 准备横坐标 - 用数字索引表示交易日
         x = np.array(range(len(recent_data)))
         
-        # 寻找局部低点作为支撑线的候选点
-        lows = []
-        for i in range(1, len(recent_data) - 1):
-            if recent_data['Low'].iloc[i] < recent_data['Low'].iloc[i-1] and \
-               recent_data['Low'].iloc[i] < recent_data['Low'].iloc[i+1]:
-                lows.append((i, recent_data['Low'].iloc[i]))
+        # 按整数位置在NumPy数组上比较相邻K线，替代逐点的Series.iloc取值
+        low_values = recent_data['Low'].to_numpy(dtype=np.float64)
+        high_values = recent_data['High'].to_numpy(dtype=np.float64)
+        
+        # 寻找局部低点作为支撑线的候选点（低于前后两根K线）
+        low_x = np.flatnonzero((low_values[1:-1] < low_values[:-2]) & (low_values[1:-1] < low_values[2:])) + 1
         
-        # 寻找局部高点作为阻力线的候选点
-        highs = []
-        for i in range(1, len(recent_data) - 1):
-            if recent_data['High'].iloc[i] > recent_data['High'].iloc[i-1] and \
-               recent_data['High'].iloc[i] > recent_data['High'].iloc[i+1]:
-                highs.append((i, recent_data['High'].iloc[i]))
+        # 寻找局部高点作为阻力线的候选点（高于前后两根K线）
+        high_x = np.flatnonzero((high_values[1:-1] > high_values[:-2]) & (high_values[1:-1] > high_values[2:])) + 1
         
         # 如果找到足够的低点，计算支撑趋势线
-        if len(lows) >= min_points:
+        if len(low_x) >= min_points:
             # 使用最小二乘法拟合直线
-            low_x = np.array([point[0] for point in lows])
-            low_y = np.array([point[1] for point in lows])
+            low_y = low_values[low_x]
             slope, intercept, r_value, p_value, std_err = stats.linregress(low_x, low_y)
             
             # 计算趋势线的强度 (R²值)
@@ -221,10 +331,9 @@ class TrendAnalyzer:
             trend_lines['support']['strength'] = strength
         
         # 如果找到足够的高点，计算阻力趋势线
-        if len(highs) >= min_points:
+        if len(high_x) >= min_points:
             # 使用最小二乘法拟合直线
-            high_x = np.array([point[0] for point in highs])
-            high_y = np.array([point[1] for point in highs])
+            high_y = high_values[high_x]
             slope, intercept, r_value, p_value, std_err = stats.linregress(high_x, high_y)
             
             # 计算趋势线的强度 (R²值)
@@ -255,6 +364,15 @@ class TrendAnalyzer:
         """
         基于Dow Theory分析趋势
         
+        返回:
+            Dict: 包含主要趋势和次要趋势的判断
+        """
+        return self._cached(('dow_theory',), self._analyze_dow_theory)
+    
+    def _analyze_dow_theory(self) -> Dict:
+        """
+        基于Dow Theory分析趋势（未缓存）
+        
         返回:
             Dict: 包含主要趋势和次要趋势的判断
         """
@@ -278,19 +396,18 @@ class TrendAnalyzer:
         ma20_value = ma20.iloc[-1]
         ma50_value = ma50.iloc[-1]
         
-        # 计算高点和低点历史
-        highs = []
-        lows = []
-        for i in range(20, len(self.price_data) - 20):
-            # 局部高点
-            if all(close.iloc[i] > close.iloc[i-20:i]) and \
-               all(close.iloc[i] > close.iloc[i+1:i+21]):
-                highs.append(close.iloc[i])
-            
-            # 局部低点
-            if all(close.iloc[i] < close.iloc[i-20:i]) and \
-               all(close.iloc[i] < close.iloc[i+1:i+21]):
-                lows.append(close.iloc[i])
+        # 计算高点和低点历史：与前后各20日的窗口极值比较，严格高于/低于即为局部极值
+        close_values = close.to_numpy()
+        window_max = sliding_window_view(close_values, 20).max(axis=1)
+        window_min = sliding_window_view(close_values, 20).min(axis=1)
+        centers = close_values[20:len(close_values) - 20]
+        n_centers = len(centers)
+        
+        # 局部高点
+        highs = centers[(centers > window_max[:n_centers]) & (centers > window_max[21:21 + n_centers])]
+        
+        # 局部低点
+        lows = centers[(centers < window_min[:n_centers]) & (centers < window_min[21:21 + n_centers])]
         
         # 检查最近20日是否形成高点或低点
         recent_high = False
@@ -320,9 +437,10 @@ class TrendAnalyzer:
         
         # 检查成交量确认
         volume_confirms = False
-        # 计算近期成交量趋势
-        recent_vol = volume.tail(5).mean()
-        prev_vol = volume.iloc[-10:-5].mean()
+        # 计算近期成交量趋势：取一次最近10日成交量数组，前后两段分别求均值（忽略NaN）
+        volume_tail = volume.to_numpy(dtype=np.float64)[-10:]
+        recent_vol = np.nanmean(volume_tail[5:])
+        prev_vol = np.nanmean(volume_tail[:5])
         
         # 判断成交量是否确认价格趋势
         if primary_trend == 'up' and recent_vol > prev_vol:
@@ -354,42 +472,23 @@ class TrendAnalyzer:
             int: 趋势强度值
         """
         # 获取ADX值
-        adx_result = self.calculate_adx()
-        adx_value = adx_result.get('adx', 15.0)
+        adx_value = self.calculate_adx().get('adx', 15.0)
         
         # 获取DoW Theory分析结果
         dow_result = self.analyze_dow_theory()
-        primary_trend = dow_result.get('primary_trend', 'neutral')
-        secondary_trend = dow_result.get('secondary_trend', 'neutral')
-        volume_confirms = dow_result.get('volume_confirms', False)
         
         # 获取趋势线分析结果
         trend_lines = self.identify_trend_lines()
         
-        # 基础分数来自ADX（0-45分）
-        adx_score = min(45, adx_value / 100 * 45)
-        
-        # 趋势一致性分数（0-25分）
-        consistency_score = 0
-        if primary_trend == secondary_trend:
-            consistency_score += 15
-        if volume_confirms:
-            consistency_score += 10
-            
-        # 趋势线强度分数（0-30分）
-        trendline_score = 0
-        support_strength = trend_lines.get('support', {}).get('strength', 0)
-        resistance_strength = trend_lines.get('resistance', {}).get('strength', 0)
-        
-        if primary_trend == 'up' and support_strength > 0:
-            trendline_score += min(30, support_strength / 3)
-        elif primary_trend == 'down' and resistance_strength > 0:
-            trendline_score += min(30, resistance_strength / 3)
-        
-        # 总分
-        total_score = int(adx_score + consistency_score + trendline_score)
-        
-        return max(0, min(100, total_score))  # 确保范围在0-100之间
+        # 先取出评分所需的标量，评分本身只做浮点运算
+        return _trend_strength_score(
+            adx_value,
+            dow_result.get('primary_trend', 'neutral'),
+            dow_result.get('secondary_trend', 'neutral'),
+            dow_result.get('volume_confirms', False),
+            trend_lines.get('support', {}).get('strength', 0),
+            trend_lines.get('resistance', {}).get('strength', 0)
+        )
         
     def analyze(self) -> Dict:
         """
@@ -402,7 +501,7 @@ class TrendAnalyzer:
         adx_result = self.calculate_adx()
         
         # 确保ADX结果有效
-        print(f"第一步检查 - 直接从adx_result获取: ADX={adx_result.get('adx', 15.0)}, +DI={adx_result.get('plus_di', 10.0)}, -DI={adx_result.get('minus_di', 10.0)}")
+        logger.debug(f"{self._log_prefix}第一步检查 - 直接从adx_result获取: ADX={adx_result.get('adx', 15.0)}, +DI={adx_result.get('plus_di', 10.0)}, -DI={adx_result.get('minus_di', 10.0)}")
         
         # 分析道氏理论
         dow_result = self.analyze_dow_theory()
@@ -437,5 +536,5 @@ class TrendAnalyzer:
             'trend_lines': trend_lines
         }
         
-        print(f"最终ADX结果: adx={adx_value}, plus_di={plus_di_value}, minus_di={minus_di_value}")
+        logger.debug(f"{self._log_prefix}最终ADX结果: adx={adx_value}, plus_di={plus_di_value}, minus_di={minus_di_value}")
         return result 
\ No newline at end of file
@@ -13,11 +13,18 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Optional, List, Tuple, Any, Union
 import re
+import threading
+from datetime import datetime
+from pathlib import Path
 from collections import OrderedDict as CollectionsOrderedDict
+from functools import lru_cache
 
 # 设置日志
 logger = logging.getLogger(__name__)
 
+# 期货合约代码格式（如ES2503），模块加载时编译一次，逐个代码转换/验证时直接复用
+_FUTURES_CONTRACT_PATTERN = re.compile(r'^([A-Z]{2})(\d{4})$')
+
 def get_stock_data(symbol: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
     """
     获取股票历史数据
@@ -64,6 +71,87 @@ def get_stock_info(symbol: str) -> Dict:
         logger.error(f"获取 {symbol} 的信息时出错: {str(e)}")
         return {}
 
+# 历史数据缓存的默认目录：放在用户主目录下，不在工作目录（代码仓库）中留下缓存文件
+DEFAULT_HISTORY_CACHE_DIR = Path.home() / ".trademind_cache"
+
+# 写入中断遗留的临时文件超过该秒数即视为孤立文件，随旧缓存一并清除
+_STALE_TMP_SECONDS = 600
+
+def _history_cache_file(cache_dir: Union[str, Path], symbol: str, period: str, day: str) -> Path:
+    """
+    生成历史数据缓存文件路径，格式为 <代码>_<周期>_<日期>.pkl
+    
+    参数:
+        cache_dir: 缓存目录
+        symbol: 股票代码
+        period: 数据周期
+        day: 日期字符串（YYYYMMDD）
+        
+    返回:
+        Path: 缓存文件路径
+    """
+    safe_symbol = re.sub(r'[^\w.\-^]', '_', symbol)
+    return Path(cache_dir) / f"{safe_symbol}_{period}_{day}.pkl"
+
+def load_cached_history(cache_dir: Union[str, Path], symbol: str, period: str) -> Optional[pd.DataFrame]:
+    """
+    读取当日缓存的股票历史数据
+    
+    参数:
+        cache_dir: 缓存目录
+        symbol: 股票代码
+        period: 数据周期
+        
+    返回:
+        Optional[pd.DataFrame]: 缓存的历史数据，未命中或读取失败时返回None
+    """
+    cache_file = _history_cache_file(cache_dir, symbol, period, datetime.now().strftime('%Y%m%d'))
+    if not cache_file.exists():
+        return None
+    try:
+        return pd.read_pickle(cache_file)
+    except Exception as e:
+        logger.warning(f"读取 {symbol} 的历史数据缓存失败: {str(e)}")
+        return None
+
+def save_cached_history(cache_dir: Union[str, Path], symbol: str, period: str, hist: pd.DataFrame) -> None:
+    """
+    将股票历史数据写入当日缓存，并清除该股票同一周期的旧缓存
+    
+    参数:
+        cache_dir: 缓存目录
+        symbol: 股票代码
+        period: 数据周期
+        hist: 股票历史数据
+    """
+    if hist is None or hist.empty:
+        return
+    try:
+        cache_dir = Path(cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        cache_file = _history_cache_file(cache_dir, symbol, period, datetime.now().strftime('%Y%m%d'))
+        
+        # 先写临时文件再替换，避免并发读取到写了一半的文件
+        tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        hist.to_pickle(tmp_file)
+        os.replace(tmp_file, cache_file)
+        
+        # 清除该股票同一周期的过期缓存，以及写入中断（如进程崩溃）遗留的临时文件；
+        # 较新的临时文件可能正由其他线程/进程写入，保留不动
+        stale_before = time.time() - _STALE_TMP_SECONDS
+        for old_file in cache_dir.glob(_history_cache_file(cache_dir, symbol, period, '*').name + '*'):
+            if old_file == cache_file:
+                continue
+            try:
+                if old_file.suffix == '.tmp' and old_file.stat().st_mtime > stale_before:
+                    continue
+                old_file.unlink(missing_ok=True)
+            except FileNotFoundError:
+                # 其他线程/进程已完成替换或删除
+                continue
+    except Exception as e:
+        logger.warning(f"写入 {symbol} 的历史数据缓存失败: {str(e)}")
+
 def convert_stock_code(code: str, market: str = "US") -> str:
     """
     转换股票代码为Yahoo Finance格式
@@ -127,10 +215,14 @@ def convert_stock_code(code: str, market: str = "US") -> str:
     
     return {"valid": False, "reason": "不支持的市场"}
 
+@lru_cache(maxsize=4096)
 def convert_index_code(code: str) -> str:
     """
     将常见指数代码和期货合约代码转换为YFinance可识别的格式
     
+    纯函数（结果只取决于代码字符串），批量导入和校验时同一代码会反复转换，
+    按代码缓存结果，命中时不再重建映射表和匹配正则。
+    
     参数:
         code: 原始代码
         
@@ -182,8 +274,7 @@ def convert_index_code(code: str) -> str:
     # 例如：ES2503 -> ES=F (标普500期货)
     # 例如：NQ2503 -> NQ=F (纳斯达克期货)
     # 例如：GC2504 -> GC=F (黄金期货)
-    futures_pattern = re.compile(r'^([A-Z]{2})(\d{4})$')
-    match = futures_pattern.match(code)
+    match = _FUTURES_CONTRACT_PATTERN.match(code)
     if match:
         futures_code = match.group(1)
         # 常见期货代码映射
@@ -246,8 +337,7 @@ def validate_stock_code(code: str, translate: bool = True) -> dict:
             }
         
         # 检查是否为期货合约代码（如ES2503, NQ2503等）
-        futures_pattern = re.compile(r'^([A-Z]{2})(\d{4})$')
-        if futures_pattern.match(code):
+        if _FUTURES_CONTRACT_PATTERN.match(code):
             return {
                 "code": code,
                 "valid": False,
@@ -26,12 +26,20 @@ from rich.align import Align
 from rich.prompt import Prompt
 
 from trademind.core.analyzer import StockAnalyzer
+from trademind.data.loader import DEFAULT_HISTORY_CACHE_DIR
 from trademind import compat
 from trademind import __version__
 
 # 创建Rich控制台
 console = Console()
 
+# 清理报告菜单的预设选项: {选项: (天数阈值, 菜单文字)}，天数为None表示清理所有报告
+_CLEAN_OPTIONS = {
+    "1": (7, "清理7天前的报告"),
+    "2": (30, "清理30天前的报告"),
+    "3": (None, "清理所有报告"),
+}
+
 def print_banner():
     """
     打印TradeMind Lite的ASCII复古风标题
@@ -96,17 +104,29 @@ def setup_logging(verbose: bool = False) -> logging.Logger:
     
     return logging.getLogger("trademind_cli")
 
+# 观察列表解析缓存: (修改时间ns, 文件大小, 解析结果)，文件未变化时不重复解析JSON
+_watchlists_cache: Optional[tuple] = None
+
 def load_watchlists() -> Dict[str, Dict[str, str]]:
     """
     加载观察列表
     
+    文件自上次加载后未被修改时直接返回缓存的解析结果。
+    
     Returns:
         观察列表字典，格式为 {group_name: {symbol: name}}
     """
+    global _watchlists_cache
     try:
         config_path = Path('config') / 'users' / 'default' / 'watchlists.json'
+        stat = config_path.stat()
+        if _watchlists_cache is not None and _watchlists_cache[:2] == (stat.st_mtime_ns, stat.st_size):
+            return _watchlists_cache[2]
+        
         with open(config_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+            watchlists = json.load(f)
+        _watchlists_cache = (stat.st_mtime_ns, stat.st_size, watchlists)
+        return watchlists
     except Exception as e:
         logging.error(f"加载观察列表失败: {str(e)}")
         return {}
@@ -168,11 +188,12 @@ def analyze_stocks(symbols: List[str], names: Dict[str, str], analyzer: StockAna
         report_path = analyzer.generate_report(results, report_title)
     
     # 如果需要，在浏览器中打开报告
+    # generate_html_report返回的已是绝对路径
     if open_browser and report_path:
-        webbrowser.open(f'file://{os.path.abspath(report_path)}')
-        console.print(f"[bold green]报告已在浏览器中打开: [link=file://{os.path.abspath(report_path)}]{os.path.basename(report_path)}[/link][/bold green]")
+        webbrowser.open(f'file://{report_path}')
+        console.print(f"[bold green]报告已在浏览器中打开: [link=file://{report_path}]{os.path.basename(report_path)}[/link][/bold green]")
     else:
-        console.print(f"[bold green]报告已生成: [link=file://{os.path.abspath(report_path)}]{os.path.basename(report_path)}[/link][/bold green]")
+        console.print(f"[bold green]报告已生成: [link=file://{report_path}]{os.path.basename(report_path)}[/link][/bold green]")
     
     return report_path
 
@@ -186,7 +207,7 @@ def run_cli() -> None:
     logger = setup_logging(False)
     
     # 创建分析器
-    analyzer = StockAnalyzer()
+    analyzer = StockAnalyzer(cache_dir=DEFAULT_HISTORY_CACHE_DIR)
     
     # 加载观察列表
     watchlists = load_watchlists()
@@ -287,7 +308,8 @@ def run_cli() -> None:
                     show_menu()
                     continue
                 
-                symbols = [s.strip().upper() for s in symbols_input.split()]
+                # 一次解析整行输入，重复输入的代码只分析一次（保持输入顺序）
+                symbols = list(dict.fromkeys(s.upper() for s in symbols_input.split()))
                 names = {}
                 
                 # 执行分析
@@ -367,16 +389,12 @@ def run_cli() -> None:
                 
                 # 处理"查询全部股票"选项
                 if int(watchlist_choice) == len(watchlist_names) + 1:
-                    # 收集所有预设股票（去重）
-                    all_symbols = []
+                    # 收集所有预设股票（去重，同一代码保留最先出现的名称和位置）
                     all_names = {}
-                    for group_name, group_stocks in watchlists.items():
-                        for code, name in group_stocks.items():
-                            if code not in all_names:  # 避免重复
-                                all_symbols.append(code)
-                                all_names[code] = name
+                    for group_stocks in watchlists.values():
+                        all_names.update({code: name for code, name in group_stocks.items() if code not in all_names})
                     
-                    symbols = all_symbols
+                    symbols = list(all_names)
                     names = all_names
                     report_title = "全市场分析报告（所有预设股票）"
                     
@@ -499,9 +517,8 @@ def run_cli() -> None:
                     clean_table.add_column("选项", style="yellow", width=6, justify="center")
                     clean_table.add_column("操作", style="green")
                     
-                    clean_table.add_row("1", "清理7天前的报告")
-                    clean_table.add_row("2", "清理30天前的报告")
-                    clean_table.add_row("3", "清理所有报告")
+                    for option, (_, label) in _CLEAN_OPTIONS.items():
+                        clean_table.add_row(option, label)
                     clean_table.add_row("4", "自定义天数")
                     clean_table.add_row("q", "返回上级菜单")
                     
@@ -520,18 +537,13 @@ def run_cli() -> None:
                         choice = "4"  # 重新进入查看历史报告功能
                         continue
                     
-                    days_threshold = None
-                    force_all = False
-                    
-                    if clean_choice == "1":
-                        days_threshold = 7
-                    elif clean_choice == "2":
-                        days_threshold = 30
-                    elif clean_choice == "3":
-                        days_threshold = None
-                        force_all = True
-                    elif clean_choice == "4":
+                    if clean_choice in _CLEAN_OPTIONS:
+                        # 预设选项：天数为None表示清理所有报告
+                        days_threshold = _CLEAN_OPTIONS[clean_choice][0]
+                        force_all = days_threshold is None
+                    else:
                         # 自定义天数
+                        force_all = False
                         days_input = Prompt.ask(
                             "[cyan]请输入要清理多少天前的报告[/cyan]",
                             default="30"
@@ -42,8 +42,8 @@ from trademind.core.signals import generate_signals
 from trademind.backtest import run_backtest
 from trademind.core.patterns import identify_candlestick_patterns
 from trademind.core.analyzer import StockAnalyzer
-from trademind.reports.generator import generate_html_report as generate_report
-from trademind.data.loader import get_stock_data, get_stock_info, validate_stock_code, batch_validate_stock_codes, update_watchlists_file, get_user_watchlists, save_user_watchlists, import_stocks_to_watchlist, is_english_name
+from trademind.reports.generator import generate_html_report as generate_report, REPORT_TIMEZONE
+from trademind.data.loader import get_stock_data, get_stock_info, validate_stock_code, batch_validate_stock_codes, update_watchlists_file, get_user_watchlists, save_user_watchlists, import_stocks_to_watchlist, is_english_name, DEFAULT_HISTORY_CACHE_DIR
 from trademind import compat
 from trademind import __version__
 from collections import OrderedDict as CollectionsOrderedDict
@@ -166,8 +166,7 @@ def analyze_stocks():
                 logger.error(f'加载watchlists文件失败: {str(e)}')
                 return jsonify({'error': '加载股票列表失败'}), 500
                 
-            # 收集所有预设股票（直接遍历文件中的组和股票）
-            all_symbols = []
+            # 收集所有预设股票（直接遍历文件中的组和股票，按首次出现的顺序去重）
             all_names = {}
             
             # 如果有分组顺序，按顺序处理
@@ -181,10 +180,7 @@ def analyze_stocks():
                         logger.info(f'处理组: {group_name}, 股票数量: {len(group_stocks)}')
                         
                         # 按照文件中的顺序添加该分组中的股票
-                        for code, name in group_stocks.items():
-                            if code not in all_names:  # 避免重复
-                                all_symbols.append(code)
-                                all_names[code] = name
+                        all_names.update({code: name for code, name in group_stocks.items() if code not in all_names})
             else:
                 # 没有分组顺序，则按照文件中定义的顺序添加股票
                 logger.info('没有找到分组顺序，使用文件中的定义顺序')
@@ -192,12 +188,9 @@ def analyze_stocks():
                 # 按照文件中定义的顺序添加股票
                 for group_name, group_stocks in all_watchlists.items():
                     logger.info(f'处理组: {group_name}, 股票数量: {len(group_stocks)}')
-                    for code, name in group_stocks.items():
-                        if code not in all_names:  # 避免重复
-                            all_symbols.append(code)
-                            all_names[code] = name
+                    all_names.update({code: name for code, name in group_stocks.items() if code not in all_names})
             
-            symbols = all_symbols
+            symbols = list(all_names)
             names = all_names
             title = "全市场分析报告（预置股票列表）"
             logger.info(f"分析所有股票，总数: {len(symbols)}")
@@ -225,7 +218,7 @@ def analyze_stocks():
             try:
                 # 确保analyzer已初始化
                 if analyzer is None:
-                    analyzer = StockAnalyzer()
+                    analyzer = StockAnalyzer(cache_dir=DEFAULT_HISTORY_CACHE_DIR)
                 
                 # 重写analyze_stocks方法，添加进度跟踪
                 results = []
@@ -570,31 +563,28 @@ def list_reports():
                 'reports': []
             })
             
-        for filename in os.listdir(analyzer.results_path):
-            if filename.endswith('.html'):
-                filepath = os.path.join(analyzer.results_path, filename)
-                # 使用美国洛杉矶时间
-                created_timestamp = os.path.getctime(filepath)
-                created_time = datetime.fromtimestamp(
-                    created_timestamp, 
-                    pytz.timezone('America/Los_Angeles')
-                )
-                # 判断是否为夏令时
-                is_dst = created_time.dst() != timedelta(0)
-                tz_suffix = "PDT" if is_dst else "PST"
-                
-                # 使用URL编码处理文件名
-                encoded_filename = quote(filename)
-                
-                reports.append({
-                    'name': filename,
-                    'url': f'/reports/{encoded_filename}',
-                    'created': created_time.strftime(f'%Y-%m-%d %H:%M:%S ({tz_suffix} Time)')
-                })
+        with os.scandir(analyzer.results_path) as entries:
+            for entry in entries:
+                if entry.name.endswith('.html'):
+                    # 使用美国洛杉矶时间，%Z根据是否为夏令时输出PDT或PST
+                    created_timestamp = entry.stat().st_ctime
+                    created_time = datetime.fromtimestamp(created_timestamp, REPORT_TIMEZONE)
+                    
+                    # 使用URL编码处理文件名
+                    encoded_filename = quote(entry.name)
+                    
+                    reports.append((created_timestamp, {
+                        'name': entry.name,
+                        'url': f'/reports/{encoded_filename}',
+                        'created': created_time.strftime('%Y-%m-%d %H:%M:%S (%Z Time)')
+                    }))
+        
+        # 按创建时间戳排序（最新的在前）
+        reports.sort(key=lambda item: item[0], reverse=True)
         
         return jsonify({
             'success': True,
-            'reports': sorted(reports, key=lambda x: x['created'], reverse=True)
+            'reports': [report for _, report in reports]
         })
         
     except Exception as e:
@@ -1230,36 +1220,23 @@ def clean_reports():
             os.makedirs(reports_dir)
             return jsonify({'success': True, 'message': '没有报告需要清理'})
         
-        # 获取当前时间
-        now = datetime.now()
+        # 文件年龄按完整天数计，达到指定天数即删除：
+        # 预先算出时间戳阈值，直接与scandir取得的修改时间比较
+        threshold_ts = (datetime.now() - timedelta(days=days)).timestamp()
         
         # 计算删除的文件数量
         deleted_count = 0
         
-        # 遍历报告目录
-        for filename in os.listdir(reports_dir):
-            file_path = os.path.join(reports_dir, filename)
-            
-            # 只处理HTML文件
-            if not filename.endswith('.html'):
-                continue
-                
-            # 如果强制删除所有，直接删除
-            if force_all:
-                os.remove(file_path)
-                deleted_count += 1
-                continue
+        # 遍历报告目录，只处理HTML文件
+        with os.scandir(reports_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.html'):
+                    continue
                 
-            # 获取文件修改时间
-            file_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-            
-            # 计算文件年龄（天）
-            file_age = (now - file_time).days
-            
-            # 如果文件年龄大于指定天数，删除它
-            if file_age >= days:
-                os.remove(file_path)
-                deleted_count += 1
+                # 如果强制删除所有，直接删除；否则只删除超过阈值的文件
+                if force_all or entry.stat().st_mtime <= threshold_ts:
+                    os.remove(entry.path)
+                    deleted_count += 1
         
         # 返回成功消息
         return jsonify({
@@ -1610,7 +1587,7 @@ def run_web_server(host='0.0.0.0', port=5000):
     logger = setup_logging(False)
     
     # 创建分析器
-    analyzer = StockAnalyzer()
+    analyzer = StockAnalyzer(cache_dir=DEFAULT_HISTORY_CACHE_DIR)
     
     # 加载观察列表
     watchlists = load_watchlists()